@@ -0,0 +1,142 @@
+"""Summary tables behind the admin dashboard.
+
+User and trip inserts/deletes are folded into small counter tables in the
+same transaction (see the before_flush listener in server.py), so the
+dashboard reads a handful of primary-key rows instead of scanning `user`
+and `trip`. If the counters ever drift (bulk SQL, restored backups),
+rebuild them from the source tables with:
+
+    python admin_stats.py rebuild
+"""
+import datetime
+import sys
+from collections import defaultdict
+
+from sqlalchemy import text
+
+# stat_counter names
+USERS = "users"
+TRIPS = "trips"
+ACTIVE_USERS = "active_users"   # users with at least one trip
+# Saved trips by where their plan came from. plan_source is reported by the
+# client unless the plan was taken from an ai_server job, so these count saved
+# trips, not generations; generation-time fallbacks are ai_server's
+# llm_fallbacks_total metric.
+SAVED_PLAN_COUNTERS = {"model": "saved_plans_model", "fallback": "saved_plans_fallback"}
+
+
+def add_to(conn, table, key_column, key, value_column, delta):
+    """Add `delta` to one summary row, creating it if needed; rows reaching 0 are removed."""
+    if conn.dialect.name == "mysql":
+        upsert = (f"INSERT INTO {table} ({key_column}, {value_column}) VALUES (:key, :delta)"
+                  f" ON DUPLICATE KEY UPDATE {value_column} = {value_column} + :delta")
+    else:
+        upsert = (f"INSERT INTO {table} ({key_column}, {value_column}) VALUES (:key, :delta)"
+                  f" ON CONFLICT ({key_column}) DO UPDATE SET {value_column} = {value_column} + :delta")
+    conn.execute(text(upsert), {"key": key, "delta": delta})
+    if delta < 0:
+        conn.execute(text(f"DELETE FROM {table} WHERE {key_column} = :key AND {value_column} <= 0"), {"key": key})
+
+
+class StatsDelta:
+    """Net changes from one flush, applied as one upsert per touched row."""
+
+    def __init__(self):
+        self.counters = defaultdict(int)
+        self.signups = defaultdict(int)
+        self.destinations = defaultdict(int)
+        self.user_trips = defaultdict(int)
+
+    def add_user(self, created_at, sign):
+        self.counters[USERS] += sign
+        self.signups[(created_at or datetime.datetime.utcnow()).date()] += sign
+
+    def add_trip(self, user_id, destination, plan_source, sign):
+        self.counters[TRIPS] += sign
+        self.user_trips[user_id] += sign
+        if destination:
+            self.destinations[destination.strip()] += sign
+        if plan_source in SAVED_PLAN_COUNTERS:
+            self.counters[SAVED_PLAN_COUNTERS[plan_source]] += sign
+
+    def apply(self, conn):
+        for user_id, delta in self.user_trips.items():
+            if not delta:
+                continue
+            add_to(conn, "stat_user_trips", "user_id", user_id, "trips", delta)
+            now = conn.execute(text("SELECT trips FROM stat_user_trips WHERE user_id = :id"),
+                               {"id": user_id}).scalar() or 0
+            # A user becomes active with their first trip and inactive after their last
+            if now > 0 and now - delta <= 0:
+                self.counters[ACTIVE_USERS] += 1
+            elif now <= 0 and now - delta > 0:
+                self.counters[ACTIVE_USERS] -= 1
+        for name, delta in self.counters.items():
+            if delta:
+                add_to(conn, "stat_counter", "name", name, "value", delta)
+        for day, delta in self.signups.items():
+            if delta:
+                add_to(conn, "stat_signup_day", "day", day, "signups", delta)
+        for destination, delta in self.destinations.items():
+            if delta:
+                add_to(conn, "stat_destination", "destination", destination, "trips", delta)
+
+
+def rebuild(conn):
+    """Recompute every summary table from `user` and `trip`."""
+    for table in ("stat_counter", "stat_signup_day", "stat_destination", "stat_user_trips"):
+        conn.execute(text(f"DELETE FROM {table}"))
+    conn.execute(text("INSERT INTO stat_signup_day (day, signups)"
+                      " SELECT DATE(created_at), COUNT(*) FROM user WHERE created_at IS NOT NULL"
+                      " GROUP BY DATE(created_at)"))
+    conn.execute(text("INSERT INTO stat_destination (destination, trips)"
+                      " SELECT TRIM(destination), COUNT(*) FROM trip"
+                      " WHERE destination IS NOT NULL AND TRIM(destination) != ''"
+                      " GROUP BY TRIM(destination)"))
+    conn.execute(text("INSERT INTO stat_user_trips (user_id, trips)"
+                      " SELECT user_id, COUNT(*) FROM trip GROUP BY user_id"))
+
+    counters = {
+        USERS: "SELECT COUNT(*) FROM user",
+        TRIPS: "SELECT COUNT(*) FROM trip",
+        ACTIVE_USERS: "SELECT COUNT(*) FROM stat_user_trips",
+    }
+    for source, name in SAVED_PLAN_COUNTERS.items():
+        counters[name] = f"SELECT COUNT(*) FROM trip WHERE plan_source = '{source}'"
+    for name, query in counters.items():
+        conn.execute(text("INSERT INTO stat_counter (name, value) VALUES (:name, :value)"),
+                     {"name": name, "value": conn.execute(text(query)).scalar()})
+
+
+def dashboard(conn, days=30, top=10):
+    """The admin dashboard: bounded primary-key/index reads, independent of table sizes."""
+    counters = dict(conn.execute(text("SELECT name, value FROM stat_counter")).all())
+    since = datetime.date.today() - datetime.timedelta(days=days - 1)
+    signups = conn.execute(text("SELECT day, signups FROM stat_signup_day WHERE day >= :since ORDER BY day"),
+                           {"since": since}).all()
+    destinations = conn.execute(text("SELECT destination, trips FROM stat_destination"
+                                     " ORDER BY trips DESC, destination LIMIT :top"), {"top": top}).all()
+    saved_plans = {source: counters.get(name, 0) for source, name in SAVED_PLAN_COUNTERS.items()}
+    return {
+        "users": counters.get(USERS, 0),
+        "active_users": counters.get(ACTIVE_USERS, 0),
+        "trips": counters.get(TRIPS, 0),
+        "saved_plans": {**saved_plans, "total": sum(saved_plans.values())},
+        "signups_per_day": [{"day": str(day), "signups": count} for day, count in signups],
+        "top_destinations": [{"destination": name, "trips": count} for name, count in destinations],
+    }
+
+
+def main(argv):
+    if argv[:1] != ["rebuild"]:
+        print(__doc__)
+        return 1
+    import server
+    with server.app.app_context(), server.db.engine.begin() as conn:
+        rebuild(conn)
+        print(f"Admin stats rebuilt: {dashboard(conn)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+# =========================
+# RESPONSE CACHE
+# =========================
+# Two tiers: a small in-process LRU in front of a SQLite table that
+# survives restarts. Both tiers honour the same TTL.
+#
+# Reads never write: the table is in WAL mode with a separate read
+# connection, disk hits only note their key, and the last_used updates are
+# written in one batch by the next set(). Async code uses aget(), which
+# answers memory hits inline and moves the disk read to a worker thread.
+
+class ResponseCache:
+    def __init__(self, db_path, ttl_seconds=86400, max_memory_entries=256, max_disk_entries=5000):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._touched = {}             # key -> last read time, not yet written
+        self._lock = threading.Lock()  # memory tier and _touched
+        self._read_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ai_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_ai_cache_last_used ON ai_cache (last_used)")
+        self._conn.commit()
+        self._read_conn = sqlite3.connect(db_path, check_same_thread=False)
+        # Upper bound on the row count; the table is only counted once this passes the limit
+        self._disk_estimate = self._conn.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0]
+
+    def get(self, key):
+        value = self._memory_get(key)
+        return value if value is not None else self._disk_get(key)
+
+    async def aget(self, key):
+        value = self._memory_get(key)
+        return value if value is not None else await asyncio.to_thread(self._disk_get, key)
+
+    def _memory_get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+        return None
+
+    def _disk_get(self, key):
+        now = time.time()
+        with self._read_lock:
+            row = self._read_conn.execute(
+                "SELECT value, expires_at FROM ai_cache WHERE key = ?", (key,)
+            ).fetchone()
+        with self._lock:
+            # Expired rows are left for the next set() to sweep
+            if row is None or row[1] <= now:
+                self.stats["misses"] += 1
+                return None
+            value = json.loads(row[0])
+            self._touched[key] = now
+            self._remember(key, value, row[1])
+            self.stats["disk_hits"] += 1
+            return value
+
+    def set(self, key, value):
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, value, expires_at)
+            touched, self._touched = self._touched, {}
+        with self._write_lock:
+            if touched:
+                self._conn.executemany(
+                    "UPDATE ai_cache SET last_used = ? WHERE key = ?",
+                    [(used, touched_key) for touched_key, used in touched.items()],
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+            self._disk_estimate += 1
+            if self._disk_estimate > self.max_disk_entries:
+                self._evict_disk(now)
+            self._conn.commit()
+            self.stats["writes"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+        with self._write_lock:
+            self._conn.execute("DELETE FROM ai_cache")
+            self._conn.commit()
+            self._disk_estimate = 0
+
+    def snapshot(self):
+        with self._read_lock:
+            disk_entries = self._read_conn.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0]
+        with self._lock:
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            lookups = hits + self.stats["misses"]
+            return {
+                **self.stats,
+                "hits": hits,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now):
+        # Trims to 90% of the limit so the count runs once per batch of writes, not per write
+        self._conn.execute("DELETE FROM ai_cache WHERE expires_at <= ?", (now,))
+        count = self._conn.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0]
+        overflow = count - int(self.max_disk_entries * 0.9)
+        if count > self.max_disk_entries and overflow > 0:
+            self._conn.execute(
+                "DELETE FROM ai_cache WHERE key IN"
+                " (SELECT key FROM ai_cache ORDER BY last_used ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.stats["evictions"] += overflow
+            count -= overflow
+        self._disk_estimate = count
+
+
+# =========================
+# KEY NORMALIZATION
+# =========================
+def _norm(value):
+    return " ".join((value or "").split()).casefold()
+
+
+def _day_span(start, end):
+    try:
+        s = datetime.strptime(start, "%Y-%m-%d").date()
+        e = datetime.strptime(end, "%Y-%m-%d").date()
+        return str((e - s).days + 1)
+    except (TypeError, ValueError):
+        return f"{_norm(start)}..{_norm(end)}"
+
+
+def _digest(parts):
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def trip_cache_key(data, context=None):
+    # `context` is extra prompt text shared by a batch (see build_trip_prompt)
+    notes_hash = hashlib.sha256(_norm(data.notes).encode("utf-8")).hexdigest()[:16]
+    parts = [
+        _norm(data.city),
+        _norm(data.country),
+        _day_span(data.startDate, data.endDate),
+        _norm(data.budgetType),
+        _norm(data.budgetAmount),
+        notes_hash,
+    ]
+    if context:
+        parts.append(_norm(context))
+    return "trip:" + _digest(parts)
+
+
+def search_cache_key(query):
+    return "search:" + _digest([_norm(query)])
+
+
+def modify_request_key(current_plan, instruction):
+    # Not cached (plans are edited freely), only used to coalesce duplicates
+    return "modify:" + _digest([current_plan or "", _norm(instruction)])
@@ -1,9 +1,31 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from bytez import Bytez
-from sqlalchemy import create_engine, Column, Integer, String, Text
-from sqlalchemy.orm import declarative_base, sessionmaker
+import asyncio
+import json
+import uuid
+import datetime
+import time
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from sqlalchemy import create_engine, Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import declarative_base, sessionmaker, deferred
+from ai_cache import ResponseCache, trip_cache_key, search_cache_key, modify_request_key
+from singleflight import SingleFlight
+from circuit_breaker import CircuitBreaker, CircuitOpen
+from job_queue import JobQueue, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED
+from destination_index import DestinationIndex
+from migrations import apply_migrations, SQLITE_MIGRATIONS
+from instrumentation import instrument_fastapi, instrument_engine, LLMCall, record_fallback, REGISTRY
+from compression import CompressedText, CompressionMiddleware
+from plan_structure import parse_plan, render_plan, plan_edit_scope, edit_plan, diff_plans, itinerary_rows
+from llm_scheduler import (
+    LLMScheduler, SchedulerRejected,
+    PRIORITY_SEARCH, PRIORITY_MODIFY, PRIORITY_GENERATE, PRIORITY_JOB,
+)
 
 # =========================
 # CONFIG
@@ -11,11 +33,47 @@ from sqlalchemy.orm import declarative_base, sessionmaker
 BYTEZ_API_KEY = "*******************************"
 MODEL_NAME = "google/gemini-3-flash-preview"
 DATABASE_URL = "sqlite:///trips.db"
+CACHE_DB_PATH = "ai_cache.db"
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+CACHE_MAX_MEMORY_ENTRIES = 256
+CACHE_MAX_DISK_ENTRIES = 5000
+LLM_MAX_CONCURRENCY = 4
+LLM_MAX_QUEUE = 32
+LLM_QUEUE_TIMEOUT_SECONDS = 30
+DESTINATION_INDEX_PATH = "destination_index.json"
+# Log requests slower than this (ms) with a SQL/LLM timing breakdown; None disables
+SLOW_REQUEST_MS = None
+JOB_WORKERS = 2
+JOB_RETRY_SECONDS = 5
+# Retries back off from JOB_RETRY_SECONDS, doubling up to JOB_RETRY_MAX_SECONDS
+JOB_RETRY_MAX_SECONDS = 300
+JOB_MAX_ATTEMPTS = 6
+JOB_RETENTION_DAYS = 7
+BATCH_MAX_ITEMS = 10
+BATCH_MAX_CONCURRENCY = 4
+# A blocking model call is abandoned after this; streams after this long without a chunk
+LLM_CALL_DEADLINE_SECONDS = 60
+LLM_STREAM_IDLE_SECONDS = 20
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30
+# Start a second, identical search call if the first hasn't answered by then; None disables
+SEARCH_HEDGE_SECONDS = None
+# JSON responses at least this large are gzip/brotli encoded
+COMPRESSION_MIN_BYTES = 1024
 
 # =========================
 # FASTAPI APP
 # =========================
-app = FastAPI(title="Agentic AI Trip Planner")
+@asynccontextmanager
+async def lifespan(app):
+    # migrate_database and the job queue are defined further down
+    await asyncio.to_thread(migrate_database)
+    await start_job_queue()
+    yield
+    await job_queue.stop()
+
+
+app = FastAPI(title="Agentic AI Trip Planner", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,12 +83,56 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route metrics and request tracing, exposed on /metrics
+instrument_fastapi(app, "ai_server", slow_request_ms=SLOW_REQUEST_MS)
+app.add_middleware(CompressionMiddleware, min_bytes=COMPRESSION_MIN_BYTES)
+
+CITY_IMAGE_URLS = [
+    "https://images.unsplash.com/photo-1493976040374-85c8e12f0c0e?auto=format&fit=crop&q=80&w=400",
+    "https://images.unsplash.com/photo-1570077188670-e3a8d69ac5ff?auto=format&fit=crop&q=80&w=400",
+    "https://images.unsplash.com/photo-1496442226666-8d4d0e62e6e9?auto=format&fit=crop&q=80&w=400",
+    "https://images.unsplash.com/photo-1580060839134-75a5edca2e99?auto=format&fit=crop&q=80&w=400",
+    "https://images.unsplash.com/photo-1506905925346-21bda4d32df4?auto=format&fit=crop&q=80&w=400",
+    "https://images.unsplash.com/photo-1516483638261-f4dbaf036963?auto=format&fit=crop&q=80&w=400"
+]
+
 # =========================
 # AI SETUP
 # =========================
 sdk = Bytez(BYTEZ_API_KEY)
 model = sdk.model(MODEL_NAME)
 
+# Only successful model responses are cached; fallbacks are never stored.
+response_cache = ResponseCache(
+    CACHE_DB_PATH,
+    ttl_seconds=CACHE_TTL_SECONDS,
+    max_memory_entries=CACHE_MAX_MEMORY_ENTRIES,
+    max_disk_entries=CACHE_MAX_DISK_ENTRIES,
+)
+
+# All model calls go through this scheduler instead of Starlette's threadpool.
+llm_scheduler = LLMScheduler(
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    max_queue=LLM_MAX_QUEUE,
+    queue_timeout=LLM_QUEUE_TIMEOUT_SECONDS,
+)
+
+# Upstream calls run on their own threads so a hung call can be abandoned at its deadline
+model_pool = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENCY * 2, thread_name_prefix="model")
+
+# While Bytez keeps failing, calls fail fast and the routes serve their fallbacks immediately
+model_breaker = CircuitBreaker(
+    failure_threshold=BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=BREAKER_RESET_SECONDS,
+)
+hedged_calls = REGISTRY.counter("llm_hedged_calls_total", "Second search calls started by hedging")
+
+# Identical in-flight requests share a single scheduled model call.
+inflight = SingleFlight()
+
+# Local destination lookup; the model is only asked about queries it can't answer.
+destination_index = DestinationIndex(DESTINATION_INDEX_PATH, images=CITY_IMAGE_URLS)
+
 # =========================
 # DATABASE SETUP
 # =========================
@@ -38,6 +140,7 @@ engine = create_engine(
     DATABASE_URL,
     connect_args={"check_same_thread": False}
 )
+instrument_engine(engine)
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
 
@@ -47,14 +150,68 @@ class Trip(Base):
     city = Column(String)
     country = Column(String)
     budget_type = Column(String)
-    plan = Column(Text)
+    # Stored compressed, and only loaded when the attribute is used
+    plan = deferred(Column(CompressedText))
+
+# Normalized copy of Trip.plan, one row per day and per activity
+class TripDay(Base):
+    __tablename__ = "trip_days"
+    id = Column(Integer, primary_key=True)
+    trip_id = Column(Integer, ForeignKey("trips.id"), nullable=False)
+    day_number = Column(Integer, nullable=False)
+    title = Column(String)
+    content = Column(Text)
+    __table_args__ = (Index("ix_trip_days_trip_id_day_number", "trip_id", "day_number", unique=True),)
+
+class Activity(Base):
+    __tablename__ = "activities"
+    id = Column(Integer, primary_key=True)
+    trip_id = Column(Integer, ForeignKey("trips.id"), nullable=False)
+    day_number = Column(Integer, nullable=False)
+    slot = Column(String)
+    position = Column(Integer, nullable=False, default=0)
+    description = Column(Text)
+    __table_args__ = (Index("ix_activities_trip_id_day_number", "trip_id", "day_number"),)
+
+# Background plan generations; survive restarts and are deduplicated by client_key
+class AIJob(Base):
+    __tablename__ = "ai_jobs"
+    id = Column(String(32), primary_key=True)
+    client_key = Column(String(255))
+    status = Column(String(20), nullable=False)
+    request = Column(Text, nullable=False)
+    plan = Column(CompressedText)
+    fallback = Column(Boolean, nullable=False, default=False)
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    __table_args__ = (
+        Index("ix_ai_jobs_client_key", "client_key", unique=True),
+        Index("ix_ai_jobs_status", "status"),
+    )
 
-Base.metadata.create_all(engine)
+def store_itinerary(db, trip):
+    db.query(TripDay).filter_by(trip_id=trip.id).delete()
+    db.query(Activity).filter_by(trip_id=trip.id).delete()
+    for day_number, title, content, activities in itinerary_rows(trip.plan):
+        db.add(TripDay(trip_id=trip.id, day_number=day_number, title=title, content=content))
+        for slot, position, description in activities:
+            db.add(Activity(
+                trip_id=trip.id, day_number=day_number,
+                slot=slot, position=position, description=description
+            ))
+
+# Brings trips.db up to date and fails fast if it has drifted from the models.
+# Runs at startup rather than import, so `python migrations.py status` can
+# import this module without applying anything.
+def migrate_database():
+    apply_migrations(engine, SQLITE_MIGRATIONS, Base.metadata)
 
 # =========================
 # SCHEMAS
 # =========================
-from typing import Optional
+from typing import List, Optional
 
 class TripCreate(BaseModel):
     city: str
@@ -78,31 +235,26 @@ class TripSave(BaseModel):
 class CitySearchQuery(BaseModel):
     query: str
 
+class TripBatch(BaseModel):
+    trips: List[TripCreate]
+
 # =========================
 # AI AGENT FUNCTIONS (FIXED)
 # =========================
 # =========================
 # AI AGENT FUNCTIONS (FIXED)
 # =========================
-def ai_generate_trip(data: TripCreate) -> str:
-    try:
-        # Check for dummy key or missing key
-        if "******" in BYTEZ_API_KEY:
-            raise Exception("Using dummy API key")
-
-        prompt = f"""
+def build_trip_prompt(data: TripCreate, context: Optional[str] = None) -> str:
+    # Shared batch context goes first so prompts in the same batch share a prefix
+    prefix = f"{context}\n" if context else ""
+    return prefix + f"""
         You are a professional AI travel planner.
         ... (prompt truncated for brevity, assume same structure) ...
         """
-        # Actual call
-        response = model.run([
-            {"role": "user", "content": prompt}
-        ])
-        return response[0]["content"]
-    except Exception as e:
-        print(f"AI Generation Error: {e}")
-        # Fallback Mock Plan
-        return f"""
+
+
+def mock_trip_plan(data: TripCreate) -> str:
+    return f"""
 Day 1: {data.city} Exploration
 Morning:
 - City Center Square – Historic gathering place with beautiful architecture.
@@ -126,28 +278,269 @@ Food:
 - Street Food Alley – Famous for local snacks.
 """
 
-def ai_modify_plan(current_plan: str, instruction: str) -> str:
-    try:
-        if "******" in BYTEZ_API_KEY:
-             raise Exception("Using dummy API key")
 
-        prompt = f"""
+def build_modify_prompt(current_plan: str, instruction: str) -> str:
+    return f"""
         ...
         """
-        response = model.run([
-            {"role": "user", "content": prompt}
-        ])
-        return response[0]["content"]
+
+
+def mock_modified_plan(current_plan: str, instruction: str) -> str:
+    return current_plan + f"\n\n[NOTE: AI Modification simulated due to missing API Key. User asked: {instruction}]"
+
+
+def build_day_edit_prompt(plan: dict, target_days: list, added_days: list, instruction: str) -> str:
+    # Only the targeted days are sent in full; the rest are listed by title for context
+    outline = "\n".join(
+        f"Day {day['day']}: {day['title']}" for day in plan["days"] if day["day"] not in target_days
+    )
+    selected = "\n\n".join(day["text"] for day in plan["days"] if day["day"] in target_days)
+    new_days = ", ".join(f"Day {number}" for number in added_days)
+    return f"""
+        You are a professional AI travel planner editing part of an existing itinerary.
+        Other days of the trip (do not repeat their activities):
+        {outline or "(none)"}
+
+        Days to edit:
+        {selected or "(none)"}
+
+        New days to write: {new_days or "(none)"}
+
+        User instruction: {instruction}
+
+        Return ONLY the edited and new days, in exactly the same format:
+        "Day N: Title" followed by "Morning:", "Afternoon:", "Evening:" and "Food:" sections with "- " items.
+        """
+
+
+def apply_day_edits(plan: dict, edited_text: str, target_days: List[int],
+                    added_days: List[int] = (), removed_days: List[int] = ()) -> dict:
+    merged = edit_plan(plan, edited_text, target_days, added_days, removed_days)
+    return {"plan": render_plan(merged), "changes": diff_plans(plan, merged)}
+
+
+def rewrite_whole_plan(plan: dict, current_plan: str, instruction: str) -> dict:
+    # Used when a partial edit came back without usable "Day N:" sections
+    rewritten = ai_modify_plan(current_plan, instruction)
+    return {"plan": rewritten, "changes": diff_plans(plan, parse_plan(rewritten))}
+
+
+def run_model(kind: str, prompt: str, hedge_after: Optional[float] = None) -> str:
+    # Single entry point for blocking model calls, timed per `kind`
+    if "******" in BYTEZ_API_KEY:
+        raise Exception("Using dummy API key")
+
+    model_breaker.allow()
+    with LLMCall(kind, prompt) as call:
+        call.response = wait_for_model(prompt, LLM_CALL_DEADLINE_SECONDS, hedge_after)
+    return call.response
+
+
+def wait_for_model(prompt: str, deadline: float, hedge_after: Optional[float] = None) -> str:
+    messages = [{"role": "user", "content": prompt}]
+    start = time.monotonic()
+    futures = [model_pool.submit(model.run, messages)]
+    if hedge_after is not None:
+        done, _ = wait(futures, timeout=min(hedge_after, deadline))
+        if not done:
+            try:
+                model_breaker.allow()
+                futures.append(model_pool.submit(model.run, messages))
+                hedged_calls.inc()
+            except CircuitOpen:
+                pass
+
+    # First successful answer wins; the call fails only when every attempt has
+    error = None
+    pending = set(futures)
+    while pending:
+        remaining = deadline - (time.monotonic() - start)
+        done, pending = wait(pending, timeout=max(remaining, 0), return_when=FIRST_COMPLETED)
+        if not done:
+            error = TimeoutError(f"Model call exceeded the {deadline}s deadline")
+            break
+        for future in done:
+            try:
+                content = future.result()[0]["content"]
+            except Exception as e:
+                error = e
+                continue
+            for other in pending:
+                other.cancel()
+            model_breaker.record_success()
+            return content
+
+    for other in pending:
+        other.cancel()
+    model_breaker.record_failure()
+    raise error
+
+
+def ai_generate_trip(data: TripCreate, use_cache: bool = True, context: Optional[str] = None) -> dict:
+    cache_key = trip_cache_key(data, context)
+    if use_cache:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return {"plan": cached, "fallback": False}
+
+    try:
+        plan = run_model("generate", build_trip_prompt(data, context))
+        response_cache.set(cache_key, plan)
+        return {"plan": plan, "fallback": False}
+    except Exception as e:
+        print(f"AI Generation Error: {e}")
+        record_fallback("generate")
+        # Fallback Mock Plan
+        return {"plan": mock_trip_plan(data), "fallback": True}
+
+def ai_modify_plan(current_plan: str, instruction: str) -> str:
+    try:
+        return run_model("modify", build_modify_prompt(current_plan, instruction))
     except Exception as e:
         print(f"AI Modification Error: {e}")
-        return current_plan + f"\n\n[NOTE: AI Modification simulated due to missing API Key. User asked: {instruction}]"
+        record_fallback("modify")
+        return mock_modified_plan(current_plan, instruction)
 
 
-def ai_search_cities(query: str) -> list:
+def ai_modify_plan_incremental(current_plan: str, instruction: str) -> dict:
+    plan = parse_plan(current_plan)
+    if not plan["days"]:
+        # Free-form plan: nothing to patch, so send the whole text
+        return {"plan": ai_modify_plan(current_plan, instruction), "changes": [], "days": []}
+
+    target_days, added_days, removed_days = plan_edit_scope(instruction, [day["day"] for day in plan["days"]])
+    touched = sorted(set(target_days) | set(added_days) | set(removed_days))
+    if not target_days and not added_days:
+        # Removing days needs no model call
+        return {**apply_day_edits(plan, "", [], [], removed_days), "days": touched}
+    try:
+        edited = run_model("modify", build_day_edit_prompt(plan, target_days, added_days, instruction))
+    except Exception as e:
+        print(f"AI Modification Error: {e}")
+        record_fallback("modify")
+        return {"plan": mock_modified_plan(current_plan, instruction), "changes": [], "days": touched}
     try:
-        if "******" in BYTEZ_API_KEY:
-            raise Exception("Using dummy API key")
+        return {**apply_day_edits(plan, edited, target_days, added_days, removed_days), "days": touched}
+    except ValueError as e:
+        print(f"Partial edit unusable, rewriting the whole plan: {e}")
+        return {**rewrite_whole_plan(plan, current_plan, instruction), "days": touched}
+
+
+# =========================
+# STREAMING AGENT FUNCTIONS
+# =========================
+# Each generator yields ("chunk", text) while the model is producing output
+# and finishes with a single ("done", {"plan": ..., "fallback": bool}).
+def stream_model_text(kind: str, prompt: str):
+    if "******" in BYTEZ_API_KEY:
+        raise Exception("Using dummy API key")
+
+    model_breaker.allow()
+    with LLMCall(kind, prompt) as call:
+        parts = []
+        try:
+            stream = model_pool.submit(model.run, [
+                {"role": "user", "content": prompt}
+            ], stream=True).result(timeout=LLM_STREAM_IDLE_SECONDS)
+            iterator = iter(stream)
+            done = object()
+            while True:
+                next_chunk = model_pool.submit(next, iterator, done)
+                try:
+                    chunk = next_chunk.result(timeout=LLM_STREAM_IDLE_SECONDS)
+                except TimeoutError:
+                    raise TimeoutError(f"No model output for {LLM_STREAM_IDLE_SECONDS}s")
+                if chunk is done:
+                    break
+                if isinstance(chunk, bytes):
+                    chunk = chunk.decode("utf-8")
+                if chunk:
+                    parts.append(chunk)
+                    yield chunk
+        except Exception:
+            model_breaker.record_failure()
+            raise
+        model_breaker.record_success()
+        call.response = "".join(parts)
+
+
+def ai_generate_trip_stream(data: TripCreate, use_cache: bool = True, fallback_on_error: bool = True):
+    cache_key = trip_cache_key(data)
+    if use_cache:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            yield "chunk", cached
+            yield "done", {"plan": cached, "fallback": False}
+            return
+
+    parts = []
+    try:
+        for chunk in stream_model_text("generate", build_trip_prompt(data)):
+            parts.append(chunk)
+            yield "chunk", chunk
+        plan = "".join(parts)
+        response_cache.set(cache_key, plan)
+        yield "done", {"plan": plan, "fallback": False}
+    except Exception as e:
+        print(f"AI Generation Error: {e}")
+        if not fallback_on_error:
+            raise
+        record_fallback("generate")
+        # The client replaces whatever it has received with the mock plan
+        yield "done", {"plan": mock_trip_plan(data), "fallback": True}
+
+
+def ai_modify_plan_stream(current_plan: str, instruction: str):
+    # For structured plans the chunks carry only the edited and added days;
+    # the done event carries the merged plan and the per-day changes.
+    plan = parse_plan(current_plan)
+    target_days, added_days, removed_days = plan_edit_scope(instruction, [day["day"] for day in plan["days"]])
+    touched = sorted(set(target_days) | set(added_days) | set(removed_days))
+    if plan["days"] and not target_days and not added_days:
+        # Removing days needs no model call
+        yield "done", {**apply_day_edits(plan, "", [], [], removed_days), "days": touched, "fallback": False}
+        return
+    if plan["days"]:
+        prompt = build_day_edit_prompt(plan, target_days, added_days, instruction)
+    else:
+        prompt = build_modify_prompt(current_plan, instruction)
+
+    parts = []
+    try:
+        for chunk in stream_model_text("modify", prompt):
+            parts.append(chunk)
+            yield "chunk", chunk
+    except Exception as e:
+        print(f"AI Modification Error: {e}")
+        record_fallback("modify")
+        yield "done", {
+            "plan": mock_modified_plan(current_plan, instruction),
+            "changes": [],
+            "days": touched,
+            "fallback": True,
+        }
+        return
+
+    if not plan["days"]:
+        result = {"plan": "".join(parts), "changes": []}
+    else:
+        try:
+            result = apply_day_edits(plan, "".join(parts), target_days, added_days, removed_days)
+        except ValueError as e:
+            # The client replaces the streamed days with the rewritten plan
+            print(f"Partial edit unusable, rewriting the whole plan: {e}")
+            result = rewrite_whole_plan(plan, current_plan, instruction)
+    yield "done", {**result, "days": touched, "fallback": False}
+
+
+def ai_search_cities(query: str, use_cache: bool = True) -> list:
+    cache_key = search_cache_key(query)
+    if use_cache:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
+    try:
         prompt = f"""
         You are an AI travel expert. Based on the search query "{query}", suggest 4-6 popular travel destinations (cities or regions).
         For each destination, provide:
@@ -167,27 +560,18 @@ def ai_search_cities(query: str) -> list:
             }}
         ]
         """
-        response = model.run([
-            {"role": "user", "content": prompt}
-        ])
-        content = response[0]["content"]
+        content = run_model("search", prompt, hedge_after=SEARCH_HEDGE_SECONDS)
         # Parse JSON
-        import json
         cities = json.loads(content)
         # Add img URLs (using Unsplash or placeholder)
-        img_urls = [
-            "https://images.unsplash.com/photo-1493976040374-85c8e12f0c0e?auto=format&fit=crop&q=80&w=400",
-            "https://images.unsplash.com/photo-1570077188670-e3a8d69ac5ff?auto=format&fit=crop&q=80&w=400",
-            "https://images.unsplash.com/photo-1496442226666-8d4d0e62e6e9?auto=format&fit=crop&q=80&w=400",
-            "https://images.unsplash.com/photo-1580060839134-75a5edca2e99?auto=format&fit=crop&q=80&w=400",
-            "https://images.unsplash.com/photo-1506905925346-21bda4d32df4?auto=format&fit=crop&q=80&w=400",
-            "https://images.unsplash.com/photo-1516483638261-f4dbaf036963?auto=format&fit=crop&q=80&w=400"
-        ]
         for i, city in enumerate(cities):
-            city["img"] = img_urls[i % len(img_urls)]
+            city["img"] = CITY_IMAGE_URLS[i % len(CITY_IMAGE_URLS)]
+        response_cache.set(cache_key, cities)
+        destination_index.add(cities)
         return cities
     except Exception as e:
         print(f"AI City Search Error: {e}")
+        record_fallback("search")
         # Fallback mock cities
         return [
             {"name": "Kyoto, Japan", "rating": 4.8, "type": "Historic", "img": "https://images.unsplash.com/photo-1493976040374-85c8e12f0c0e?auto=format&fit=crop&q=80&w=400", "description": "Ancient temples and traditional culture."},
@@ -200,33 +584,362 @@ def ai_search_cities(query: str) -> list:
 # =========================
 # API ROUTES
 # =========================
+def wants_cache(cache_control: Optional[str]) -> bool:
+    # Clients can force a fresh generation with "Cache-Control: no-cache"
+    return "no-cache" not in (cache_control or "").lower()
+
+
+async def cached_trip_plan(data: TripCreate, use_cache: bool) -> Optional[str]:
+    return await response_cache.aget(trip_cache_key(data)) if use_cache else None
+
+
+async def generate_trip_plan(data: TripCreate, use_cache: bool, context: Optional[str] = None) -> dict:
+    cache_key = trip_cache_key(data, context)
+    plan = await response_cache.aget(cache_key) if use_cache else None
+    if plan is not None:
+        return {"plan": plan, "fallback": False}
+    return await inflight.do(
+        cache_key,
+        lambda: llm_scheduler.run(ai_generate_trip, data, False, context, priority=PRIORITY_GENERATE)
+    )
+
+
+@app.exception_handler(SchedulerRejected)
+async def scheduler_rejected(request: Request, exc: SchedulerRejected):
+    return JSONResponse(
+        {"detail": str(exc)},
+        status_code=exc.status_code,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+# Cache hits are answered directly; only real model work goes through the scheduler.
 @app.post("/api/create-agentic-plan")
-def create_agentic_plan(data: TripCreate):
-    plan = ai_generate_trip(data)
-    return {"plan": plan}
+async def create_agentic_plan(data: TripCreate, cache_control: Optional[str] = Header(None)):
+    return await generate_trip_plan(data, wants_cache(cache_control))
 
 
 @app.post("/api/modify-plan")
-def modify_plan(data: PlanModify):
-    plan = ai_modify_plan(
-        data.current_plan,
-        data.user_instruction
+async def modify_plan(data: PlanModify):
+    return await inflight.do(
+        modify_request_key(data.current_plan, data.user_instruction),
+        lambda: llm_scheduler.run(
+            ai_modify_plan_incremental,
+            data.current_plan,
+            data.user_instruction,
+            priority=PRIORITY_MODIFY
+        )
     )
-    return {"plan": plan}
 
 
-@app.post("/api/search-cities")
-def search_cities(data: CitySearchQuery):
-    # Temporary mock data for testing
-    cities = [
-        {"name": "Kyoto, Japan", "rating": 4.8, "type": "Historic", "img": "https://images.unsplash.com/photo-1493976040374-85c8e12f0c0e?auto=format&fit=crop&q=80&w=400", "description": "Ancient temples and traditional culture."},
-        {"name": "Santorini, Greece", "rating": 4.9, "type": "Romantic", "img": "https://images.unsplash.com/photo-1570077188670-e3a8d69ac5ff?auto=format&fit=crop&q=80&w=400", "description": "Stunning sunsets and white-washed buildings."},
-        {"name": "New York, USA", "rating": 4.7, "type": "Urban", "img": "https://images.unsplash.com/photo-1496442226666-8d4d0e62e6e9?auto=format&fit=crop&q=80&w=400", "description": "The city that never sleeps."},
-        {"name": "Cape Town, SA", "rating": 4.6, "type": "Adventure", "img": "https://images.unsplash.com/photo-1580060839134-75a5edca2e99?auto=format&fit=crop&q=80&w=400", "description": "Table Mountain and coastal beauty."}
+async def replay_events(events):
+    for item in events:
+        yield item
+
+
+def sse_response(events):
+    async def encode():
+        async for event, payload in events:
+            if event == "chunk":
+                payload = {"text": payload}
+            yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    return StreamingResponse(
+        encode(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/create-agentic-plan/stream")
+async def create_agentic_plan_stream(data: TripCreate, cache_control: Optional[str] = Header(None)):
+    plan = await cached_trip_plan(data, wants_cache(cache_control))
+    if plan is not None:
+        return sse_response(replay_events([
+            ("chunk", plan),
+            ("done", {"plan": plan, "fallback": False}),
+        ]))
+    events = await inflight.stream(
+        "stream:" + trip_cache_key(data),
+        lambda: llm_scheduler.iterate(
+            ai_generate_trip_stream(data, use_cache=False),
+            priority=PRIORITY_GENERATE
+        )
+    )
+    return sse_response(events)
+
+
+@app.post("/api/modify-plan/stream")
+async def modify_plan_stream(data: PlanModify):
+    events = await inflight.stream(
+        "stream:" + modify_request_key(data.current_plan, data.user_instruction),
+        lambda: llm_scheduler.iterate(
+            ai_modify_plan_stream(data.current_plan, data.user_instruction),
+            priority=PRIORITY_MODIFY
+        )
+    )
+    return sse_response(events)
+
+
+def batch_contexts(trips: List[TripCreate]) -> List[Optional[str]]:
+    # Cities of the same country are planned as one multi-city trip: they share
+    # the same context line (and so the same prompt prefix) and avoid repeats.
+    cities = {}
+    for trip in trips:
+        country_cities = cities.setdefault(trip.country.strip().casefold(), [])
+        if trip.city.strip() not in country_cities:
+            country_cities.append(trip.city.strip())
+
+    contexts = []
+    for trip in trips:
+        country_cities = cities[trip.country.strip().casefold()]
+        if len(country_cities) > 1:
+            contexts.append(
+                f"This plan is one stop of a multi-city trip through {trip.country.strip()} "
+                f"covering {', '.join(country_cities)}. Plan only the city named below "
+                f"and do not repeat activities that belong to the other cities."
+            )
+        else:
+            contexts.append(None)
+    return contexts
+
+
+async def batch_plan_events(trips: List[TripCreate], use_cache: bool):
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def run_item(index, data, context):
+        async with semaphore:
+            try:
+                return "result", {"index": index, **await generate_trip_plan(data, use_cache, context)}
+            except SchedulerRejected as e:
+                return "error", {"index": index, "detail": str(e),
+                                 "status": e.status_code, "retry_after": e.retry_after}
+            except Exception as e:
+                print(f"AI Batch Error: {e}")
+                return "error", {"index": index, "detail": str(e), "status": 500}
+
+    # Each item is independent: results are sent as they finish, failures stay per item
+    tasks = [
+        asyncio.ensure_future(run_item(index, data, context))
+        for index, (data, context) in enumerate(zip(trips, batch_contexts(trips)))
     ]
+    failed = 0
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            event, payload = await next_result
+            failed += event == "error"
+            yield event, payload
+        yield "done", {"count": len(trips), "failed": failed}
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@app.post("/api/create-agentic-plan/batch")
+async def create_agentic_plan_batch(data: TripBatch, cache_control: Optional[str] = Header(None)):
+    if not data.trips:
+        raise HTTPException(400, "trips must not be empty")
+    if len(data.trips) > BATCH_MAX_ITEMS:
+        raise HTTPException(400, f"A batch can contain at most {BATCH_MAX_ITEMS} trips")
+    return sse_response(batch_plan_events(data.trips, wants_cache(cache_control)))
+
+
+@app.post("/api/search-cities")
+async def search_cities(data: CitySearchQuery, cache_control: Optional[str] = Header(None)):
+    use_cache = wants_cache(cache_control)
+    if use_cache:
+        cities = destination_index.search(data.query)
+        if cities:
+            return {"cities": cities}
+    cities = await response_cache.aget(search_cache_key(data.query)) if use_cache else None
+    if cities is None:
+        cities = await inflight.do(
+            search_cache_key(data.query),
+            lambda: llm_scheduler.run(ai_search_cities, data.query, False, priority=PRIORITY_SEARCH)
+        )
     return {"cities": cities}
 
 
+@app.get("/api/cache/stats")
+def cache_stats():
+    return response_cache.snapshot()
+
+
+@app.get("/api/search-cities/autocomplete")
+def autocomplete_cities(q: str, limit: int = 6):
+    return {"cities": destination_index.search(q, limit=min(limit, 20))}
+
+
+@app.get("/api/destinations/stats")
+def destination_stats():
+    return destination_index.snapshot()
+
+
+@app.get("/api/scheduler/stats")
+def scheduler_stats():
+    return {
+        **llm_scheduler.snapshot(),
+        "coalescing": inflight.snapshot(),
+        "jobs": job_queue.snapshot(),
+        "circuit": model_breaker.snapshot(),
+    }
+
+
+# The existing stats endpoints, also exported as gauges on /metrics
+REGISTRY.gauge("ai_response_cache", "Response cache counters", response_cache.snapshot, "stat")
+REGISTRY.gauge("ai_scheduler", "LLM scheduler counters", llm_scheduler.snapshot, "stat")
+REGISTRY.gauge("ai_singleflight", "Coalesced request counters", inflight.snapshot, "stat")
+REGISTRY.gauge("ai_model_circuit", "Model circuit breaker counters", model_breaker.snapshot, "stat")
+
+
+# =========================
+# BACKGROUND JOBS
+# =========================
+def utcnow():
+    return datetime.datetime.utcnow()
+
+
+def job_dict(job: AIJob) -> dict:
+    return {
+        "id": job.id,
+        "status": job.status,
+        "plan": job.plan if job.status == JOB_DONE else None,
+        "fallback": job.fallback,
+        "error": job.error,
+        "attempts": job.attempts,
+        "created_at": job.created_at.isoformat(),
+        "updated_at": job.updated_at.isoformat(),
+    }
+
+
+def save_job_state(job_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None,
+                   attempts: Optional[int] = None):
+    db = SessionLocal()
+    try:
+        job = db.get(AIJob, job_id)
+        job.status = status
+        job.updated_at = utcnow()
+        if result is not None:
+            job.plan = result["plan"]
+            job.fallback = result.get("fallback", False)
+            job.error = None
+        if error is not None:
+            job.error = error
+        if attempts is not None:
+            job.attempts = attempts
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run_trip_job(job_id: str):
+    # Background jobs wait for the model to recover rather than store a mock plan.
+    # Once the reset timeout has passed the job goes through and may be the half-open probe.
+    if model_breaker.is_open():
+        raise SchedulerRejected("Model is unavailable", 503, BREAKER_RESET_SECONDS)
+    job = await asyncio.to_thread(load_job, job_id)
+    data = TripCreate(**json.loads(job.request))
+    plan = await cached_trip_plan(data, True)
+    if plan is not None:
+        return replay_events([("done", {"plan": plan, "fallback": False})])
+    # Model errors fail the attempt so the queue retries it; with the dummy key
+    # there is no model to wait for, so the mock plan is kept
+    stream = ai_generate_trip_stream(data, use_cache=False, fallback_on_error="******" in BYTEZ_API_KEY)
+    return await llm_scheduler.iterate(stream, priority=PRIORITY_JOB)
+
+
+job_queue = JobQueue(
+    run_trip_job, save_job_state, workers=JOB_WORKERS, retry_delay=JOB_RETRY_SECONDS,
+    max_retry_delay=JOB_RETRY_MAX_SECONDS, max_attempts=JOB_MAX_ATTEMPTS
+)
+REGISTRY.gauge("ai_jobs", "Background job counters", job_queue.snapshot, "stat")
+
+
+def load_pending_jobs() -> list:
+    db = SessionLocal()
+    try:
+        # Drop old finished jobs; anything still running was cut off by the restart
+        cutoff = utcnow() - datetime.timedelta(days=JOB_RETENTION_DAYS)
+        db.query(AIJob).filter(AIJob.status.in_([JOB_DONE, JOB_FAILED]), AIJob.updated_at < cutoff).delete()
+        db.query(AIJob).filter(AIJob.status == JOB_RUNNING).update({"status": JOB_QUEUED})
+        db.commit()
+        return db.query(AIJob.id, AIJob.attempts).filter(AIJob.status == JOB_QUEUED).order_by(AIJob.created_at).all()
+    finally:
+        db.close()
+
+
+async def start_job_queue():
+    job_queue.start(await asyncio.to_thread(load_pending_jobs))
+
+
+def create_job(request_json: str, idempotency_key: Optional[str]):
+    """Insert a queued job; returns (job_dict, created). A repeated Idempotency-Key returns the existing job."""
+    db = SessionLocal()
+    try:
+        if idempotency_key:
+            existing = db.query(AIJob).filter_by(client_key=idempotency_key).first()
+            if existing is not None:
+                if existing.request != request_json:
+                    raise HTTPException(409, "Idempotency-Key was already used for a different trip")
+                return job_dict(existing), False
+
+        now = utcnow()
+        job = AIJob(
+            id=uuid.uuid4().hex, client_key=idempotency_key, status=JOB_QUEUED,
+            request=request_json, created_at=now, updated_at=now
+        )
+        db.add(job)
+        try:
+            db.commit()
+        except IntegrityError:
+            raise HTTPException(409, "A job with this Idempotency-Key is being created")
+        return job_dict(job), True
+    finally:
+        db.close()
+
+
+# Clients send the same Idempotency-Key when retrying a submission
+@app.post("/api/jobs", status_code=202)
+async def submit_trip_job(data: TripCreate, idempotency_key: Optional[str] = Header(None)):
+    request_json = json.dumps(data.model_dump(), sort_keys=True)
+    job, created = await asyncio.to_thread(create_job, request_json, idempotency_key)
+    if created:
+        job_queue.submit(job["id"])
+    return job
+
+
+def load_job(job_id: str) -> AIJob:
+    db = SessionLocal()
+    try:
+        job = db.get(AIJob, job_id)
+    finally:
+        db.close()
+    if job is None:
+        raise HTTPException(404, "Job not found")
+    return job
+
+
+@app.get("/api/jobs/{job_id}")
+def get_trip_job(job_id: str):
+    return job_dict(load_job(job_id))
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def trip_job_events(job_id: str):
+    # Subscribe before reading the row: the queue saves the final state before
+    # it stops broadcasting, so a job that is no longer live is final in the database
+    events = job_queue.watch(job_id)
+    if events is not None:
+        return sse_response(events)
+    job = await asyncio.to_thread(load_job, job_id)
+    # Already finished: a single final event
+    if job.status == JOB_DONE:
+        final = ("done", {"plan": job.plan, "fallback": job.fallback})
+    else:
+        final = ("error", {"detail": job.error or f"Job is {job.status}"})
+    return sse_response(replay_events([final]))
+
+
 @app.post("/api/save-trip")
 def save_trip(data: TripSave):
     db = SessionLocal()
@@ -237,6 +950,8 @@ def save_trip(data: TripSave):
         plan=data.final_plan
     )
     db.add(trip)
+    db.flush()
+    store_itinerary(db, trip)
     db.commit()
     db.close()
     return {"status": "saved"}
@@ -0,0 +1,116 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+# =========================
+# VERIFIED TOKEN CACHE
+# =========================
+# Remembers tokens that already passed jwt.decode, and the user row they
+# belong to, for at most `ttl` seconds and never past the token's own `exp`.
+# Bounded LRU; entries for a user are dropped together when that user changes,
+# and revoked tokens are rejected until they would have expired anyway.
+#
+# All of this is per process: invalidate_user() and revoke() only reach the
+# worker they run in. Other workers pick up a changed or deleted user, or a
+# revocation persisted by the caller, once their entries pass `ttl`.
+
+
+def token_key(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenCache:
+    def __init__(self, max_tokens=10000, max_users=5000, ttl=60):
+        self.max_tokens = max_tokens
+        self.max_users = max_users
+        self.ttl = ttl
+        self._tokens = OrderedDict()   # token key -> (user_id, exp, expires_at)
+        self._users = OrderedDict()    # user_id -> (column dict, expires_at)
+        self._user_tokens = {}         # user_id -> set of token keys
+        self._revoked = {}             # token key -> exp
+        self._lock = threading.Lock()
+        self.stats = {"token_hits": 0, "token_misses": 0, "user_hits": 0, "user_misses": 0}
+
+    def get_token(self, token):
+        """Return (user_id, exp) for a cached token, or None."""
+        key = token_key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._tokens.get(key)
+            if entry is None or entry[2] <= now:
+                if entry is not None:
+                    self._drop_token(key)
+                self.stats["token_misses"] += 1
+                return None
+            self._tokens.move_to_end(key)
+            self.stats["token_hits"] += 1
+            return entry[0], entry[1]
+
+    def put_token(self, token, user_id, exp):
+        key = token_key(token)
+        with self._lock:
+            self._tokens[key] = (user_id, exp, min(exp, time.time() + self.ttl))
+            self._tokens.move_to_end(key)
+            self._user_tokens.setdefault(user_id, set()).add(key)
+            while len(self._tokens) > self.max_tokens:
+                self._drop_token(next(iter(self._tokens)))
+
+    def get_user(self, user_id):
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._users[user_id]
+                self.stats["user_misses"] += 1
+                return None
+            self._users.move_to_end(user_id)
+            self.stats["user_hits"] += 1
+            return dict(entry[0])
+
+    def put_user(self, user_id, row, exp):
+        """Cache a user row; `exp` is that of the token it was loaded for."""
+        with self._lock:
+            self._users[user_id] = (dict(row), min(exp, time.time() + self.ttl))
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        """Forget a user's row and every cached token for it."""
+        with self._lock:
+            self._users.pop(user_id, None)
+            for key in self._user_tokens.pop(user_id, set()):
+                self._tokens.pop(key, None)
+
+    def revoke(self, token, exp):
+        key = token_key(token)
+        with self._lock:
+            self._revoked[key] = exp
+            self._drop_token(key)
+            now = time.time()
+            for revoked_key, revoked_exp in list(self._revoked.items()):
+                if revoked_exp <= now:
+                    del self._revoked[revoked_key]
+
+    def is_revoked(self, token):
+        with self._lock:
+            return token_key(token) in self._revoked
+
+    def _drop_token(self, key):
+        entry = self._tokens.pop(key, None)
+        if entry is not None:
+            keys = self._user_tokens.get(entry[0])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._user_tokens[entry[0]]
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                **self.stats,
+                "tokens": len(self._tokens),
+                "users": len(self._users),
+                "revoked": len(self._revoked),
+            }
@@ -0,0 +1,40 @@
+"""Logins per second against password pool size.
+
+Run from backend/:  python benchmarks/bench_password_hashing.py [logins] [max_workers]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import password_pool
+
+
+def bench(workers, logins):
+    password_pool.configure(workers)
+    password_hash = password_pool.hash_password("correct horse battery staple")  # also warms the pool
+    # One client thread per simulated request, as Flask's threaded server would use
+    with ThreadPoolExecutor(max_workers=max(8, workers * 2)) as clients:
+        start = time.perf_counter()
+        results = list(clients.map(
+            lambda _: password_pool.verify_password(password_hash, "correct horse battery staple"),
+            range(logins),
+        ))
+        elapsed = time.perf_counter() - start
+    assert all(results)
+    return logins / elapsed
+
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 2)
+    print(f"{'pool size':>9} | {'logins/s':>9}")
+    workers = 1
+    while workers <= max_workers:
+        print(f"{workers:>9} | {bench(workers, logins):>9.1f}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Offline stand-ins for the Bytez model used by ai_server.py.
+
+FakeModel answers like the real SDK (``model.run(messages)`` returns
+``[{"content": ...}]``; ``stream=True`` returns an iterator of text chunks)
+with configurable latency and token rate. ReplayModel serves responses
+recorded earlier by RecordingModel, keyed on the prompt.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+SAMPLE_PLAN = """Day {day}: {title}
+Morning:
+- Old Town Walk – Cobbled streets and the main square.
+- Cathedral Visit – Climb the tower for the view.
+Afternoon:
+- City Museum – Local art and history.
+Evening:
+- River Cruise – Sunset over the bridges.
+Food:
+- Market Hall – Regional dishes and street food.
+"""
+
+SAMPLE_CITIES = [
+    {"name": "Lyon, France", "rating": 4.7, "type": "Food", "description": "Traditional bouchons and Roman ruins."},
+    {"name": "Porto, Portugal", "rating": 4.7, "type": "Historic", "description": "Port cellars along the Douro."},
+    {"name": "Ljubljana, Slovenia", "rating": 4.6, "type": "Urban", "description": "A green capital with a castle view."},
+    {"name": "Bruges, Belgium", "rating": 4.6, "type": "Romantic", "description": "Canals and medieval guild houses."},
+]
+
+
+def prompt_key(messages):
+    text = "\n".join(m.get("content", "") for m in messages)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def default_response(messages):
+    prompt = messages[-1].get("content", "")
+    if "JSON array" in prompt:
+        return json.dumps(SAMPLE_CITIES)
+    if "Days to edit" in prompt:
+        # Answer with the days the edit prompt asked for, edited and new
+        edited, _, added = prompt.split("Days to edit:", 1)[1].partition("New days to write:")
+        days = {int(n) for n in re.findall(r"^\s*Day (\d+):", edited, re.M)}
+        days |= {int(n) for n in re.findall(r"Day (\d+)", added.split("User instruction:", 1)[0])}
+        return "\n".join(SAMPLE_PLAN.format(day=d, title="Edited Day") for d in sorted(days) or [1])
+    return "\n".join(SAMPLE_PLAN.format(day=d, title=f"Day {d} Highlights") for d in range(1, 4))
+
+
+class FakeModel:
+    def __init__(self, latency=0.5, tokens_per_second=200.0, chars_per_token=4, respond=default_response):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.chars_per_token = chars_per_token
+        self.respond = respond
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _generation_time(self, text):
+        if not self.tokens_per_second:
+            return 0.0
+        return len(text) / self.chars_per_token / self.tokens_per_second
+
+    def run(self, messages, stream=False):
+        with self._lock:
+            self.calls += 1
+        text = self.respond(messages)
+        if stream:
+            return self._stream(text)
+        time.sleep(self.latency + self._generation_time(text))
+        return [{"content": text}]
+
+    def _stream(self, text):
+        time.sleep(self.latency)
+        step = self.chars_per_token * 8
+        for i in range(0, len(text), step):
+            chunk = text[i:i + step]
+            time.sleep(self._generation_time(chunk))
+            yield chunk
+
+
+class ReplayModel(FakeModel):
+    """Serves recorded responses; unknown prompts fall back to the FakeModel output."""
+
+    def __init__(self, path, **kwargs):
+        with open(path, encoding="utf-8") as f:
+            self.recordings = json.load(f)
+        super().__init__(respond=self._lookup, **kwargs)
+        self.misses = 0
+
+    def _lookup(self, messages):
+        recorded = self.recordings.get(prompt_key(messages))
+        if recorded is None:
+            self.misses += 1
+            return default_response(messages)
+        return recorded
+
+
+class RecordingModel:
+    """Wraps a real model and saves each response for later replay."""
+
+    def __init__(self, inner, path):
+        self.inner = inner
+        self.path = path
+        self._lock = threading.Lock()
+        self.recordings = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.recordings = json.load(f)
+
+    def run(self, messages, stream=False):
+        if stream:
+            chunks = list(self.inner.run(messages, stream=True))
+            self._save(messages, "".join(chunks))
+            return iter(chunks)
+        response = self.inner.run(messages)
+        self._save(messages, response[0]["content"])
+        return response
+
+    def _save(self, messages, text):
+        with self._lock:
+            self.recordings[prompt_key(messages)] = text
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.recordings, f, ensure_ascii=False, indent=1)
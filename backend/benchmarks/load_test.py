@@ -0,0 +1,219 @@
+"""Offline load test for server.py and ai_server.py.
+
+Both services run in-process on localhost: server.py against a throwaway
+SQLite database instead of MySQL, ai_server.py with a fake (or replayed)
+model instead of Bytez. Virtual users then run the usual journey:
+
+    register -> login -> create-agentic-plan -> modify-plan -> save trip -> list trips
+
+and throughput plus p50/p95/p99 latency are reported per route.
+
+Run from backend/:
+
+    python benchmarks/load_test.py --users 8 --iterations 5
+    python benchmarks/load_test.py --latency 2 --tokens-per-second 50 --no-cache
+    python benchmarks/load_test.py --replay recordings.json
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_model import FakeModel, ReplayModel, RecordingModel
+
+CITIES = [("Prague", "Czech Republic"), ("Lisbon", "Portugal"), ("Kyoto", "Japan"),
+          ("Cusco", "Peru"), ("Vienna", "Austria"), ("Hanoi", "Vietnam")]
+
+
+# =========================
+# SERVICES
+# =========================
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_services(args, workdir):
+    # Relative paths in ai_server.py (trips.db, ai_cache.db, ...) land in workdir
+    os.chdir(workdir)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'travel_app.db')}"
+
+    import server
+    import ai_server
+    import uvicorn
+    from werkzeug.serving import make_server
+
+    # SQLite stand-in for MySQL: the migrations are MySQL DDL, so build from the models
+    with server.app.app_context():
+        server.db.create_all()
+
+    if args.replay:
+        model = ReplayModel(args.replay, latency=args.latency, tokens_per_second=args.tokens_per_second)
+    else:
+        model = FakeModel(latency=args.latency, tokens_per_second=args.tokens_per_second)
+    if args.record:
+        model = RecordingModel(ai_server.model, args.record)
+    else:
+        ai_server.BYTEZ_API_KEY = "offline-benchmark"
+    ai_server.model = model
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    flask_server = make_server("127.0.0.1", 0, server.app, threaded=True)
+    threading.Thread(target=flask_server.serve_forever, daemon=True).start()
+
+    ai_port = free_port()
+    ai = uvicorn.Server(uvicorn.Config(ai_server.app, host="127.0.0.1", port=ai_port, log_level="warning"))
+    threading.Thread(target=ai.run, daemon=True).start()
+    while not ai.started:
+        time.sleep(0.05)
+
+    return f"http://127.0.0.1:{flask_server.server_port}", f"http://127.0.0.1:{ai_port}", model
+
+
+# =========================
+# CLIENT
+# =========================
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def add(self, route, seconds, ok):
+        with self._lock:
+            self.samples[route].append(seconds)
+            if not ok:
+                self.errors[route] += 1
+
+
+def call(recorder, route, method, url, body=None, headers=None, first_byte_route=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={
+        "Content-Type": "application/json", **(headers or {})
+    })
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=300) as res:
+            if first_byte_route:
+                res.read(1)
+                recorder.add(first_byte_route, time.perf_counter() - start, True)
+            payload = res.read()
+            status = res.status
+    except urllib.error.HTTPError as e:
+        payload, status = e.read(), e.code
+    elapsed = time.perf_counter() - start
+    recorder.add(route, elapsed, 200 <= status < 400)
+    try:
+        return status, json.loads(payload or b"null")
+    except ValueError:
+        return status, payload.decode("utf-8", "replace")
+
+
+def sse_final_plan(body):
+    for event in body.split("\n\n"):
+        if event.startswith("event: done"):
+            return json.loads(event.split("data: ", 1)[1])["plan"]
+    return ""
+
+
+def journey(user_id, args, api, ai, recorder):
+    email = f"bench-{user_id}-{int(time.time() * 1000)}@example.com"
+    call(recorder, "POST /api/auth/register", "POST", f"{api}/api/auth/register",
+         {"name": f"Bench {user_id}", "email": email, "password": "bench-password"})
+    _, login = call(recorder, "POST /api/auth/login", "POST", f"{api}/api/auth/login",
+                    {"email": email, "password": "bench-password"})
+    auth = {"Authorization": f"Bearer {login['token']}"} if isinstance(login, dict) and "token" in login else {}
+    ai_headers = {"Cache-Control": "no-cache"} if args.no_cache else {}
+
+    for i in range(args.iterations):
+        city, country = CITIES[(user_id + i) % len(CITIES)]
+        trip = {"city": city, "country": country, "startDate": "2025-06-01",
+                "endDate": "2025-06-03", "budgetType": "Flexible", "notes": ""}
+
+        if args.stream:
+            _, plan_text = call(recorder, "POST /api/create-agentic-plan/stream", "POST",
+                                f"{ai}/api/create-agentic-plan/stream", trip, ai_headers,
+                                first_byte_route="POST /api/create-agentic-plan/stream (first byte)")
+            plan = sse_final_plan(plan_text) if isinstance(plan_text, str) else ""
+        else:
+            _, result = call(recorder, "POST /api/create-agentic-plan", "POST",
+                             f"{ai}/api/create-agentic-plan", trip, ai_headers)
+            plan = result.get("plan", "") if isinstance(result, dict) else ""
+
+        _, modified = call(recorder, "POST /api/modify-plan", "POST", f"{ai}/api/modify-plan",
+                           {"current_plan": plan, "user_instruction": "Make day 2 evening more relaxed"})
+        final_plan = modified.get("plan", plan) if isinstance(modified, dict) else plan
+
+        call(recorder, "POST /api/trips", "POST", f"{api}/api/trips",
+             {**trip, "final_plan": final_plan}, auth)
+        call(recorder, "GET /api/trips", "GET", f"{api}/api/trips", None, auth)
+
+
+# =========================
+# REPORT
+# =========================
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(p / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def report(recorder, wall_time):
+    print(f"\n{'route':<48} {'n':>5} {'err':>4} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for route in sorted(recorder.samples):
+        values = sorted(recorder.samples[route])
+        print(f"{route:<48} {len(values):>5} {recorder.errors[route]:>4} {len(values) / wall_time:>7.1f}"
+              f" {percentile(values, 50) * 1000:>8.1f} {percentile(values, 95) * 1000:>8.1f}"
+              f" {percentile(values, 99) * 1000:>8.1f}")
+    total = sum(len(v) for v in recorder.samples.values())
+    print(f"\n{total} requests in {wall_time:.2f}s ({total / wall_time:.1f} req/s overall)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--users", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=3, help="journey loops per user")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake model time to first token (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="fake model generation rate")
+    parser.add_argument("--replay", help="JSON file of recorded model responses to serve")
+    parser.add_argument("--record", help="call the real model and record its responses to this file")
+    parser.add_argument("--no-cache", action="store_true", help="send Cache-Control: no-cache to AI routes")
+    parser.add_argument("--stream", action="store_true", help="use the streaming plan endpoint")
+    args = parser.parse_args()
+    if args.replay:
+        args.replay = os.path.abspath(args.replay)
+    if args.record:
+        args.record = os.path.abspath(args.record)
+
+    workdir = tempfile.mkdtemp(prefix="travel-bench-")
+    api, ai, model = start_services(args, workdir)
+    print(f"server.py on {api}, ai_server.py on {ai}, data in {workdir}")
+
+    recorder = Recorder()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        for future in [pool.submit(journey, u, args, api, ai, recorder) for u in range(args.users)]:
+            future.result()
+    report(recorder, time.perf_counter() - start)
+    print(f"model calls: {getattr(model, 'calls', 'n/a')}")
+    _, cache = call(Recorder(), "stats", "GET", f"{ai}/api/cache/stats")
+    print(f"response cache: {cache}")
+
+
+if __name__ == "__main__":
+    main()
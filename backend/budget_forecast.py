@@ -0,0 +1,139 @@
+import json
+import os
+
+import numpy as np
+
+# =========================
+# BUDGET FORECAST
+# =========================
+# Costs come from budget_costs.json: a mid-range daily cost per city and
+# category, scaled per budget type. All trips in a request are flattened
+# into one array of days, so forecasting one trip or a hundred is the same
+# handful of NumPy operations, with no model call involved.
+
+COSTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "budget_costs.json")
+DEFAULT_ACTIVITIES_PER_DAY = 3
+# Bands are the 10th to 90th percentile
+BAND_Z = 1.2816
+
+
+def normal_cdf(x):
+    # Abramowitz & Stegun 7.1.26 erf approximation, vectorized
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-z * z)
+    return 0.5 * (1 + np.sign(x) * erf)
+
+
+def _band(mean, sd):
+    return np.round(mean, 2), np.round(np.maximum(mean - BAND_Z * sd, 0), 2), np.round(mean + BAND_Z * sd, 2)
+
+
+class BudgetForecaster:
+    def __init__(self, path=COSTS_PATH):
+        with open(path, encoding="utf-8") as f:
+            table = json.load(f)
+        self.currency = table["currency"]
+        self.categories = table["categories"]
+        # Row 0 is the default for destinations missing from the table
+        self._city_rows = {name.casefold(): i + 1 for i, name in enumerate(table["cities"])}
+        self._costs = np.array([table["default"]] + list(table["cities"].values()), dtype=float)
+        self._budget_rows = {name.casefold(): i for i, name in enumerate(table["budget_types"])}
+        self._multipliers = np.array(list(table["budget_types"].values()), dtype=float)
+        self._default_budget = self._budget_rows.get("flexible", 0)
+        self._spread = np.array(table["spread"], dtype=float)
+
+    def city_row(self, destination):
+        # Accepts "Kyoto" as well as "Kyoto, Japan"
+        return self._city_rows.get((destination or "").split(",")[0].strip().casefold(), 0)
+
+    def budget_row(self, budget_type):
+        return self._budget_rows.get((budget_type or "").strip().casefold(), self._default_budget)
+
+    def forecast(self, trips, include_days=True):
+        """Forecast each trip; returns one dict per trip, in order.
+
+        Each trip is a dict with id, destination, budget_type, budget_amount,
+        day_count and activities ({day_number: activity count}, empty when the
+        trip has no structured plan yet).
+        """
+        if not trips:
+            return []
+        day_counts = np.array([max(int(t["day_count"]), 1) for t in trips])
+        offsets = np.concatenate(([0], np.cumsum(day_counts)[:-1]))
+        trip_idx = np.repeat(np.arange(len(trips)), day_counts)
+        day_no = np.arange(int(day_counts.sum())) - offsets[trip_idx] + 1
+        is_last = day_no == day_counts[trip_idx]
+
+        # Planned activities per day; trips without a plan assume a typical day
+        has_plan = np.array([bool(t.get("activities")) for t in trips])
+        activities = np.where(has_plan[trip_idx], 0.0, DEFAULT_ACTIVITIES_PER_DAY)
+        planned = np.array([
+            (i, day, count)
+            for i, t in enumerate(trips)
+            for day, count in (t.get("activities") or {}).items()
+            if 1 <= day <= day_counts[i]
+        ], dtype=int).reshape(-1, 3)
+        activities[offsets[planned[:, 0]] + planned[:, 1] - 1] = planned[:, 2]
+
+        city_rows = np.array([self.city_row(t.get("destination")) for t in trips])
+        budget_rows = np.array([self.budget_row(t.get("budget_type")) for t in trips])
+        base = (self._costs[city_rows] * self._multipliers[budget_rows])[trip_idx]
+
+        # Columns: accommodation, food, activities, transport
+        factors = np.ones_like(base)
+        factors[is_last, 0] = 0                                      # no night after the last day
+        factors[:, 2] = activities / DEFAULT_ACTIVITIES_PER_DAY      # spend follows planned activities
+        factors[(day_no == 1) | is_last, 3] += 0.5                   # arrival/departure transfers
+        daily = base * factors
+
+        totals = np.zeros((len(trips), daily.shape[1]))
+        np.add.at(totals, trip_idx, daily)
+        # A trip's price level is shared by all its days, so a category's
+        # uncertainty scales with its total; categories vary independently.
+        category_sd = totals * self._spread
+        total_mean = totals.sum(axis=1)
+        total_sd = np.sqrt((category_sd ** 2).sum(axis=1))
+
+        amounts = np.array([np.nan if t.get("budget_amount") is None else t["budget_amount"] for t in trips], dtype=float)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            over_probability = np.round(1 - normal_cdf((amounts - total_mean) / total_sd), 3)
+
+        total = [b.tolist() for b in _band(total_mean, total_sd)]
+        category = [b.tolist() for b in _band(totals, category_sd)]
+        if include_days:
+            day_sd = np.sqrt(((daily * self._spread) ** 2).sum(axis=1))
+            day_band = [b.tolist() for b in _band(daily.sum(axis=1), day_sd)]
+            day_categories = np.round(daily, 2).tolist()
+
+        results = []
+        for i, trip in enumerate(trips):
+            result = {
+                "trip_id": trip["id"],
+                "currency": self.currency,
+                "day_count": int(day_counts[i]),
+                "total": {"mean": total[0][i], "low": total[1][i], "high": total[2][i]},
+                "categories": {
+                    name: {"mean": category[0][i][c], "low": category[1][i][c], "high": category[2][i][c]}
+                    for c, name in enumerate(self.categories)
+                },
+                "budget": None,
+            }
+            if not np.isnan(amounts[i]):
+                result["budget"] = {
+                    "amount": float(amounts[i]),
+                    "remaining": round(float(amounts[i]) - total[0][i], 2),
+                    "over_probability": float(over_probability[i]),
+                }
+            if include_days:
+                start, end = int(offsets[i]), int(offsets[i] + day_counts[i])
+                result["days"] = [{
+                    "day": d - start + 1,
+                    "mean": day_band[0][d],
+                    "low": day_band[1][d],
+                    "high": day_band[2][d],
+                    "categories": dict(zip(self.categories, day_categories[d])),
+                } for d in range(start, end)]
+            results.append(result)
+        return results
@@ -0,0 +1,89 @@
+import math
+import threading
+import time
+
+# =========================
+# CIRCUIT BREAKER
+# =========================
+# After `failure_threshold` consecutive failures the circuit opens and calls
+# fail immediately with CircuitOpen, so callers go straight to their
+# fallback instead of waiting on a dead upstream. After `reset_timeout`
+# seconds a single probe call is let through (half-open): success closes
+# the circuit, failure opens it again.
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpen(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Circuit open, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+        self.stats = {"opened": 0, "short_circuited": 0, "probes": 0}
+
+    def allow(self):
+        """Raise CircuitOpen unless a call may go through right now."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                remaining = self.reset_timeout - (now - self._opened_at)
+                if remaining > 0:
+                    self.stats["short_circuited"] += 1
+                    raise CircuitOpen(math.ceil(remaining))
+                self.state = HALF_OPEN
+                self._probe_started = None
+
+            if self.state == HALF_OPEN:
+                # One probe at a time; a probe that never reported back is replaced
+                if self._probe_started is not None and now - self._probe_started < self.reset_timeout:
+                    self.stats["short_circuited"] += 1
+                    raise CircuitOpen(math.ceil(self.reset_timeout - (now - self._probe_started)))
+                self._probe_started = now
+                self.stats["probes"] += 1
+
+    def is_open(self):
+        """True while allow() would refuse a call; unlike allow(), changes nothing."""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                return now - self._opened_at < self.reset_timeout
+            if self.state == HALF_OPEN:
+                return self._probe_started is not None and now - self._probe_started < self.reset_timeout
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self._failures = 0
+            self._probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.stats["opened"] += 1
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_started = None
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                **self.stats,
+                "state": self.state,
+                "open": int(self.state == OPEN),
+                "consecutive_failures": self._failures,
+            }
@@ -0,0 +1,170 @@
+"""Compressed plan storage and HTTP response compression for both services.
+
+Plans are stored zlib-compressed behind a NUL marker byte. Rows written
+before that are still plain text and are read back unchanged, so the
+backfill can run at any time. Responses at or above a size threshold are
+sent gzip-encoded, or brotli-encoded when the optional `brotli` package is
+installed and the client accepts it.
+"""
+import gzip
+import zlib
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSED_MARKER = b"\x00"
+COMPRESSIBLE_TYPES = ("application/json", "text/html", "text/plain", "text/css", "application/javascript")
+
+
+# =========================
+# STORAGE
+# =========================
+def compress_text(value):
+    return COMPRESSED_MARKER + zlib.compress(value.encode("utf-8"), 6)
+
+
+def decompress_text(value):
+    if isinstance(value, str):
+        return value
+    value = bytes(value)
+    if value.startswith(COMPRESSED_MARKER):
+        return zlib.decompress(value[1:]).decode("utf-8")
+    return value.decode("utf-8")
+
+
+def is_compressed(value):
+    return isinstance(value, (bytes, bytearray)) and bytes(value[:1]) == COMPRESSED_MARKER
+
+
+class CompressedText(TypeDecorator):
+    """A text column stored compressed; reads plain-text legacy values as-is."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return compress_text(value) if value is not None else None
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value) if value is not None else None
+
+
+# =========================
+# RESPONSES
+# =========================
+def choose_encoding(accept_encoding):
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.partition(";")
+        try:
+            quality = float(params.strip()[2:]) if params.strip().startswith("q=") else 1.0
+        except ValueError:
+            quality = 0.0
+        if quality > 0:
+            accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress_body(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def compressible(content_type):
+    return (content_type or "").split(";")[0].strip().lower() in COMPRESSIBLE_TYPES
+
+
+def add_vary(existing):
+    if not existing:
+        return "Accept-Encoding"
+    if "accept-encoding" in existing.lower():
+        return existing
+    return f"{existing}, Accept-Encoding"
+
+
+def compress_flask(app):
+    """Compress responses of at least app.config['COMPRESSION_MIN_BYTES']; None disables."""
+    from flask import request
+
+    @app.after_request
+    def _compress_response(response):
+        min_bytes = app.config.get("COMPRESSION_MIN_BYTES")
+        if (min_bytes is None or response.direct_passthrough or response.is_streamed
+                or "Content-Encoding" in response.headers or not compressible(response.content_type)):
+            return response
+        response.headers["Vary"] = add_vary(response.headers.get("Vary"))
+        encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+        body = response.get_data()
+        if encoding is None or len(body) < min_bytes:
+            return response
+        response.set_data(compress_body(body, encoding))
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            # A strong tag names exact bytes, and these differ from the identity response
+            response.set_etag(etag, weak=True)
+        return response
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses of at least `min_bytes`.
+
+    Only compressible types are buffered; SSE and other streams pass through untouched.
+    """
+
+    def __init__(self, app, min_bytes=1024):
+        self.app = app
+        self.min_bytes = min_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        held = None
+        chunks = []
+
+        async def send_wrapper(message):
+            nonlocal held
+            if message["type"] == "http.response.start":
+                response_headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"vary"]
+                vary = next((v.decode("latin-1") for k, v in message.get("headers", []) if k.lower() == b"vary"), None)
+                content_type = next((v.decode("latin-1") for k, v in response_headers if k.lower() == b"content-type"), "")
+                already_encoded = any(k.lower() == b"content-encoding" for k, _ in response_headers)
+                if compressible(content_type) and not already_encoded:
+                    vary = add_vary(vary)
+                if vary is not None:
+                    response_headers.append((b"vary", vary.encode("latin-1")))
+                message = {**message, "headers": response_headers}
+                if encoding and compressible(content_type) and not already_encoded:
+                    held = message
+                    return
+                return await send(message)
+
+            if held is None or message["type"] != "http.response.body":
+                return await send(message)
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body"):
+                return
+            body = b"".join(chunks)
+            start, held = held, None
+            if len(body) >= self.min_bytes:
+                body = compress_body(body, encoding)
+                start["headers"] = [(k, v) for k, v in start["headers"] if k.lower() != b"content-length"] + [
+                    (b"content-encoding", encoding.encode("latin-1")),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ]
+            await send(start)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,205 @@
+import bisect
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+
+# =========================
+# DESTINATION INDEX
+# =========================
+# In-memory index over known destinations, seeded from destinations.json and
+# grown from every successful AI city search. Supports prefix autocomplete on
+# names, countries, types and tags, plus typo tolerance on the city name
+# (trigrams find candidates, edit distance decides). Persisted as JSON so restarts don't lose what the AI taught it.
+
+SEED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "destinations.json")
+
+STOPWORDS = {
+    "a", "an", "and", "the", "in", "of", "to", "for", "with", "near", "trip", "trips",
+    "city", "cities", "place", "places", "destination", "destinations",
+}
+
+
+def _normalize(text):
+    return re.sub(r"[^\w\s]", " ", (text or "").casefold()).split()
+
+
+def _trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _allowed_edits(word):
+    return 0 if len(word) < 4 else 1 if len(word) < 8 else 2
+
+
+def _edit_distance(a, b, limit):
+    """Levenshtein distance counting adjacent swaps as one edit; anything over `limit` is limit + 1."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+class DestinationIndex:
+    def __init__(self, path, seed_path=SEED_PATH, images=()):
+        self.path = path
+        self.images = list(images)
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._terms = []
+        self._trigrams = defaultdict(set)
+        self.stats = {"hits": 0, "misses": 0, "learned": 0}
+
+        source = path if os.path.exists(path) else seed_path
+        try:
+            with open(source, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Destination index load error: {e}")
+            entries = []
+        for i, entry in enumerate(entries):
+            if not entry.get("img") and self.images:
+                entry["img"] = self.images[i % len(self.images)]
+            self._insert(entry)
+
+    def _key(self, name):
+        return " ".join(_normalize(name))
+
+    def _insert(self, entry):
+        key = self._key(entry["name"])
+        if not key:
+            return
+        existing = self._entries.get(key)
+        if existing is not None:
+            # Keep the richer description/image, count the sighting
+            existing["popularity"] = existing.get("popularity", 0) + 1
+            for field in ("rating", "type", "description", "img"):
+                existing[field] = existing.get(field) or entry.get(field)
+            return
+
+        entry = {
+            "name": entry["name"],
+            "rating": entry.get("rating", 0),
+            "type": entry.get("type", ""),
+            "description": entry.get("description", ""),
+            "img": entry.get("img", ""),
+            "tags": entry.get("tags", []),
+            "popularity": entry.get("popularity", 0),
+        }
+        self._entries[key] = entry
+
+        terms = {key}
+        terms.update(_normalize(entry["name"]))
+        terms.update(_normalize(entry["type"]))
+        for tag in entry["tags"]:
+            terms.add(" ".join(_normalize(tag)))
+            terms.update(_normalize(tag))
+        for term in terms:
+            bisect.insort(self._terms, (term, key))
+
+        # Trigrams on the city part ("Kyoto" of "Kyoto, Japan") for typo tolerance
+        city = "".join(_normalize(entry["name"].split(",")[0]))
+        entry["_city"] = city
+        for gram in _trigrams(city):
+            self._trigrams[gram].add(key)
+
+    def _prefix_matches(self, prefix):
+        start = bisect.bisect_left(self._terms, (prefix,))
+        matches = set()
+        for term, key in self._terms[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.add(key)
+        return matches
+
+    def _fuzzy_matches(self, word):
+        # Any city sharing a trigram is a candidate; single typos ("kyto",
+        # "tokio") are within one edit, longer names allow two
+        limit = _allowed_edits(word)
+        if not limit:
+            return {}
+        candidates = set()
+        for gram in _trigrams(word):
+            candidates.update(self._trigrams.get(gram, ()))
+        scores = {}
+        for key in candidates:
+            city = self._entries[key]["_city"]
+            distance = _edit_distance(word, city, limit)
+            if distance <= limit:
+                scores[key] = 1 - distance / max(len(word), len(city))
+        return scores
+
+    def search(self, query, limit=6):
+        """Return up to `limit` destinations for a query, or [] on an index miss."""
+        words = [w for w in _normalize(query) if w not in STOPWORDS]
+        with self._lock:
+            scores = defaultdict(float)
+            whole = " ".join(_normalize(query))
+            for key in self._prefix_matches(whole) if whole else ():
+                scores[key] += len(words) + 1
+            # Otherwise a destination has to match every term, by prefix or as a
+            # close typo; partial matches ("museums in peru") go to the model
+            candidates = None
+            term_scores = defaultdict(float)
+            for word in words:
+                matched = dict.fromkeys(self._prefix_matches(word), 1.0)
+                if not matched:
+                    matched = self._fuzzy_matches(word)
+                candidates = set(matched) if candidates is None else candidates & set(matched)
+                if not candidates:
+                    break
+                for key, score in matched.items():
+                    term_scores[key] += score
+            for key in candidates or ():
+                scores[key] += term_scores[key]
+
+            if not scores:
+                self.stats["misses"] += 1
+                return []
+            self.stats["hits"] += 1
+            ranked = sorted(
+                scores,
+                key=lambda k: (scores[k], self._entries[k]["popularity"], self._entries[k]["rating"]),
+                reverse=True,
+            )
+            return [self._public(self._entries[k]) for k in ranked[:limit]]
+
+    def add(self, cities):
+        """Learn destinations from an AI search result and persist the index."""
+        with self._lock:
+            for city in cities:
+                if isinstance(city, dict) and city.get("name"):
+                    self._insert(dict(city))
+                    self.stats["learned"] += 1
+            self.save()
+
+    def save(self):
+        with self._lock:
+            entries = [
+                {k: v for k, v in entry.items() if not k.startswith("_")}
+                for entry in self._entries.values()
+            ]
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Destination index save error: {e}")
+
+    def snapshot(self):
+        return {**self.stats, "destinations": len(self._entries), "terms": len(self._terms)}
+
+    @staticmethod
+    def _public(entry):
+        return {field: entry[field] for field in ("name", "rating", "type", "img", "description")}
@@ -0,0 +1,295 @@
+"""Shared metrics and per-request tracing for server.py (Flask) and ai_server.py (FastAPI).
+
+Metrics are kept in-process and rendered in the Prometheus text format on
+each service's /metrics endpoint. Every request also gets a RequestTrace
+(held in a contextvar) that SQL and LLM timings are added to; with a slow
+request threshold configured, requests over it are logged with that breakdown.
+"""
+import bisect
+import contextvars
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+# =========================
+# METRICS
+# =========================
+def _label_str(labelnames, values):
+    if not labelnames:
+        return ""
+    pairs = ",".join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(labelnames, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_str(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, "") for n in self.labelnames)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._values[key] = (counts, total + value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += count
+                    lines.append(f"{self.name}_bucket{_label_str(names, key + (bound,))} {cumulative}")
+                lines.append(f"{self.name}_sum{_label_str(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_label_str(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Read at render time from a callback returning a number or {label_value: number}."""
+
+    def __init__(self, name, help_text, callback, labelname=None):
+        self.name = name
+        self.help = help_text
+        self.callback = callback
+        self.labelname = labelname
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        try:
+            value = self.callback()
+        except Exception as e:
+            print(f"Metrics Error: {self.name}: {e}")
+            return lines
+        if isinstance(value, dict):
+            for label, v in sorted(value.items()):
+                if isinstance(v, (int, float)):
+                    lines.append(f"{self.name}{_label_str((self.labelname,), (label,))} {v}")
+        else:
+            lines.append(f"{self.name} {value}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _get(self, cls, name, *args, **kwargs):
+        if name not in self._metrics:
+            self._metrics[name] = cls(name, *args, **kwargs)
+        return self._metrics[name]
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._get(Counter, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help_text, labelnames, buckets)
+
+    def gauge(self, name, help_text, callback, labelname=None):
+        self._metrics[name] = Gauge(name, help_text, callback, labelname)
+        return self._metrics[name]
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+http_requests = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route and status", ("service", "method", "route", "status"))
+http_latency = REGISTRY.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("service", "method", "route"))
+sql_statements = REGISTRY.histogram(
+    "sql_statements_per_request", "SQL statements executed per request", ("service", "route"), COUNT_BUCKETS)
+sql_seconds = REGISTRY.counter(
+    "sql_statement_seconds_total", "Time spent in SQL statements", ("service", "route"))
+llm_calls = REGISTRY.counter(
+    "llm_calls_total", "Model calls by kind and outcome", ("kind", "outcome"))
+llm_latency = REGISTRY.histogram(
+    "llm_call_duration_seconds", "Model call duration", ("kind",))
+llm_prompt_chars = REGISTRY.histogram(
+    "llm_prompt_chars", "Prompt size in characters", ("kind",), SIZE_BUCKETS)
+llm_response_chars = REGISTRY.histogram(
+    "llm_response_chars", "Response size in characters", ("kind",), SIZE_BUCKETS)
+llm_fallbacks = REGISTRY.counter(
+    "llm_fallbacks_total", "Responses served from the mock fallback instead of the model", ("kind",))
+
+
+# =========================
+# REQUEST TRACING
+# =========================
+class RequestTrace:
+    def __init__(self, service, method, path):
+        self.service = service
+        self.method = method
+        self.path = path
+        self.route = path
+        self.start = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.llm_count = 0
+        self.llm_seconds = 0.0
+
+    def breakdown(self, total):
+        other = max(total - self.sql_seconds - self.llm_seconds, 0.0)
+        return (f"total={total * 1000:.1f}ms sql={self.sql_seconds * 1000:.1f}ms/{self.sql_count} stmts "
+                f"llm={self.llm_seconds * 1000:.1f}ms/{self.llm_count} calls other={other * 1000:.1f}ms")
+
+
+current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+def start_trace(service, method, path):
+    trace = RequestTrace(service, method, path)
+    return trace, current_trace.set(trace)
+
+
+def finish_trace(trace, token, status, slow_request_ms=None):
+    current_trace.reset(token)
+    total = time.perf_counter() - trace.start
+    http_requests.inc(service=trace.service, method=trace.method, route=trace.route, status=status)
+    http_latency.observe(total, service=trace.service, method=trace.method, route=trace.route)
+    sql_statements.observe(trace.sql_count, service=trace.service, route=trace.route)
+    if trace.sql_seconds:
+        sql_seconds.inc(trace.sql_seconds, service=trace.service, route=trace.route)
+    if slow_request_ms is not None and total * 1000 >= slow_request_ms:
+        print(f"Slow request: {trace.method} {trace.path} -> {status} {trace.breakdown(total)}")
+
+
+def instrument_engine(engine):
+    """Count SQL statements and their time against the current request's trace."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        trace = current_trace.get()
+        if trace is not None:
+            trace.sql_count += 1
+            trace.sql_seconds += elapsed
+
+
+class LLMCall:
+    """Context manager timing one model call: `with LLMCall("generate", prompt) as call: call.response = ...`."""
+
+    def __init__(self, kind, prompt):
+        self.kind = kind
+        self.prompt = prompt
+        self.response = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        if exc_type is None:
+            outcome = "ok"
+        elif issubclass(exc_type, TimeoutError):
+            outcome = "timeout"
+        elif issubclass(exc_type, GeneratorExit):
+            # A stream closed by its consumer before the model finished
+            outcome = "cancelled"
+        else:
+            outcome = "error"
+        llm_calls.inc(kind=self.kind, outcome=outcome)
+        llm_latency.observe(elapsed, kind=self.kind)
+        llm_prompt_chars.observe(len(self.prompt), kind=self.kind)
+        if self.response is not None:
+            llm_response_chars.observe(len(self.response), kind=self.kind)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.llm_count += 1
+            trace.llm_seconds += elapsed
+        return False
+
+
+def record_fallback(kind):
+    llm_fallbacks.inc(kind=kind)
+
+
+# =========================
+# FRAMEWORK HOOKS
+# =========================
+def instrument_flask(app, service):
+    """Slow-request logging follows app.config['SLOW_REQUEST_MS'] (None disables)."""
+    from flask import request, g
+
+    @app.before_request
+    def _start_trace():
+        g._trace, g._trace_token = start_trace(service, request.method, request.path)
+
+    @app.after_request
+    def _finish_trace(response):
+        trace = g.pop("_trace", None)
+        if trace is not None:
+            trace.route = request.url_rule.rule if request.url_rule else "unmatched"
+            finish_trace(trace, g.pop("_trace_token"), response.status_code, app.config.get("SLOW_REQUEST_MS"))
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return app.response_class(REGISTRY.render(), mimetype=CONTENT_TYPE)
+
+
+def instrument_fastapi(app, service, slow_request_ms=None):
+    from fastapi.responses import PlainTextResponse
+
+    @app.middleware("http")
+    async def _trace_requests(request, call_next):
+        trace, token = start_trace(service, request.method, request.url.path)
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            trace.route = getattr(route, "path", "unmatched")
+            finish_trace(trace, token, status, slow_request_ms)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,135 @@
+import asyncio
+
+from singleflight import _Broadcast
+
+# =========================
+# BACKGROUND AI JOBS
+# =========================
+# Jobs run on a fixed number of worker tasks, independent of the request
+# that submitted them, so a client disconnect no longer throws the work
+# away. State is persisted through `save` after every transition; live
+# progress (status changes and model chunks) is buffered per job so any
+# number of watchers can replay it until the job finishes.
+#
+# A job that is rejected or errors is requeued with exponential backoff
+# (retry_delay, doubling, capped at max_retry_delay) and marked failed once
+# it has been tried max_attempts times. The attempt count is persisted, so
+# a restart does not reset it.
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class JobQueue:
+    def __init__(self, handler, save, workers=2, retry_delay=5.0, max_retry_delay=300.0, max_attempts=5):
+        # handler(job_id) -> awaitable returning an async iterator of
+        #   ("chunk", text) ... ("done", result_dict)
+        # save(job_id, status, result=None, error=None, attempts=None) persists a transition
+        self.handler = handler
+        self.save = save
+        self.workers = workers
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.max_attempts = max_attempts
+        self._queue = None
+        self._tasks = []
+        self._live = {}
+        self._attempts = {}
+        self.stats = {"submitted": 0, "done": 0, "failed": 0, "retried": 0}
+
+    def start(self, pending=()):
+        """Start the workers and re-enqueue (job_id, attempts) left unfinished by a restart."""
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        for job_id, attempts in pending:
+            self.submit(job_id, attempts)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, job_id, attempts=0):
+        if job_id in self._live:
+            return
+        broadcast = _Broadcast(asyncio.get_running_loop())
+        broadcast.publish(("status", {"status": JOB_QUEUED}))
+        self._live[job_id] = broadcast
+        self._attempts[job_id] = attempts
+        self.stats["submitted"] += 1
+        self._queue.put_nowait(job_id)
+
+    def watch(self, job_id):
+        """Async iterator over a queued/running job's events, or None once it has finished."""
+        broadcast = self._live.get(job_id)
+        return broadcast.subscribe() if broadcast is not None else None
+
+    async def _save(self, job_id, status, **fields):
+        # save() does blocking database I/O
+        await asyncio.to_thread(self.save, job_id, status, **fields)
+
+    def _requeue(self, job_id):
+        self._queue.put_nowait(job_id)
+
+    def backoff(self, attempt, retry_after=None):
+        delay = self.retry_delay * 2 ** (attempt - 1)
+        return min(max(delay, retry_after or 0), self.max_retry_delay)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                # Persisting state failed; keep the worker alive for the next job
+                print(f"AI Job Error: {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id):
+        broadcast = self._live[job_id]
+        attempt = self._attempts[job_id] + 1
+        self._attempts[job_id] = attempt
+        await self._save(job_id, JOB_RUNNING, attempts=attempt)
+        broadcast.publish(("status", {"status": JOB_RUNNING, "attempt": attempt}))
+        try:
+            result = None
+            async for event, payload in await self.handler(job_id):
+                if event == "done":
+                    result = payload
+                else:
+                    broadcast.publish((event, payload))
+            if result is None:
+                raise Exception("Job finished without a result")
+        except Exception as e:
+            print(f"AI Job Error: {job_id}: attempt {attempt}: {e}")
+            if attempt < self.max_attempts:
+                # Saturated or failing model: try again later, backing off each time
+                delay = self.backoff(attempt, getattr(e, "retry_after", None))
+                self.stats["retried"] += 1
+                await self._save(job_id, JOB_QUEUED, error=str(e))
+                broadcast.publish(("status", {"status": JOB_QUEUED, "attempt": attempt, "retry_in": delay}))
+                asyncio.get_running_loop().call_later(delay, self._requeue, job_id)
+                return
+            error = f"Gave up after {attempt} attempts: {e}"
+            self.stats["failed"] += 1
+            await self._save(job_id, JOB_FAILED, error=error)
+            broadcast.publish(("error", {"detail": error}))
+        else:
+            self.stats["done"] += 1
+            await self._save(job_id, JOB_DONE, result=result)
+            broadcast.publish(("done", result))
+        self._live.pop(job_id, None)
+        self._attempts.pop(job_id, None)
+        broadcast.finish()
+
+    def snapshot(self):
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "live": len(self._live),
+        }
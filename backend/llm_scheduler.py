@@ -0,0 +1,133 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+# =========================
+# LLM EXECUTION SCHEDULER
+# =========================
+# Blocking model calls run on a dedicated thread pool so they never occupy
+# the web server's own worker threads. At most `max_concurrency` calls run
+# at once; further callers wait in a bounded priority queue (lower number
+# is served first) and give up after `queue_timeout` seconds.
+
+PRIORITY_SEARCH = 0
+PRIORITY_MODIFY = 1
+PRIORITY_GENERATE = 2
+# Background jobs yield to anyone waiting on a response
+PRIORITY_JOB = 3
+
+
+class SchedulerRejected(Exception):
+    """Raised when a call cannot be scheduled. Carries the HTTP status to report."""
+
+    def __init__(self, message, status_code, retry_after):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency=4, max_queue=32, queue_timeout=30.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._running = 0
+        self._waiters = []
+        self._counter = itertools.count()
+        self.stats = {"completed": 0, "rejected_full": 0, "rejected_timeout": 0}
+
+    @property
+    def queued(self):
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    def retry_after(self):
+        # Rough estimate: one queue timeout per "round" of waiting callers
+        rounds = (self.queued + 1) / max(self.max_concurrency, 1)
+        return max(1, math.ceil(rounds * self.queue_timeout / 2))
+
+    async def acquire(self, priority=PRIORITY_GENERATE):
+        if self._running < self.max_concurrency and not self.queued:
+            self._running += 1
+            return
+
+        if self.queued >= self.max_queue:
+            self.stats["rejected_full"] += 1
+            raise SchedulerRejected("AI service is busy, please retry shortly", 429, self.retry_after())
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                # Slot was handed over just as we timed out; give it back
+                self.release()
+            else:
+                future.cancel()
+            self.stats["rejected_timeout"] += 1
+            raise SchedulerRejected("Timed out waiting for the AI service", 503, self.retry_after())
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            else:
+                future.cancel()
+            raise
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot straight to the next waiter
+                future.set_result(None)
+                return
+        self._running -= 1
+
+    async def run_blocking(self, fn, *args):
+        """Run `fn` on the scheduler's thread pool without taking a slot."""
+        # Carry the caller's contextvars (e.g. the request trace) into the worker thread
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, context.run, fn, *args)
+
+    async def run(self, fn, *args, priority=PRIORITY_GENERATE):
+        await self.acquire(priority)
+        try:
+            return await self.run_blocking(fn, *args)
+        finally:
+            self.stats["completed"] += 1
+            self.release()
+
+    async def iterate(self, iterable, priority=PRIORITY_GENERATE):
+        """Return an async iterator over a blocking iterator, holding one slot until it ends.
+
+        The slot is acquired before this returns, so rejections surface as
+        errors to the caller rather than mid-stream.
+        """
+        await self.acquire(priority)
+        iterator = iter(iterable)
+        sentinel = object()
+
+        async def drain():
+            try:
+                while True:
+                    item = await self.run_blocking(next, iterator, sentinel)
+                    if item is sentinel:
+                        break
+                    yield item
+            finally:
+                self.stats["completed"] += 1
+                self.release()
+
+        return drain()
+
+    def snapshot(self):
+        return {
+            **self.stats,
+            "running": self._running,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+        }
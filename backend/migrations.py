@@ -0,0 +1,510 @@
+"""Versioned schema migrations for travel_app_db (MySQL) and trips.db (SQLite).
+
+Applied versions are recorded in a schema_migrations table together with a
+checksum of the migration's source, so an edited or unknown migration stops
+startup instead of silently diverging. Run pending migrations with:
+
+    python migrations.py            # both databases
+    python migrations.py mysql      # server.py only
+    python migrations.py sqlite     # ai_server.py only
+    python migrations.py status     # show applied/pending, change nothing
+
+ai_server.py applies its SQLite migrations in its startup hook. server.py
+applies the MySQL ones only when started with `python server.py`; under
+gunicorn or `flask run`, run `python migrations.py mysql` as a deploy step
+before starting the app.
+"""
+import datetime
+import hashlib
+import inspect as pyinspect
+import sys
+
+from sqlalchemy import inspect, text
+
+from plan_structure import itinerary_rows
+from compression import compress_text, decompress_text, is_compressed
+import admin_stats
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    def __init__(self, version, fn):
+        self.version = version
+        self.fn = fn
+        self.name = fn.__name__
+        self.checksum = hashlib.sha256(pyinspect.getsource(fn).encode("utf-8")).hexdigest()
+
+
+# =========================
+# HELPERS
+# =========================
+def has_column(conn, table, column):
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+
+def create_index_if_missing(conn, table, name, columns):
+    # Any existing index that starts with the same columns (e.g. the one InnoDB
+    # adds for a foreign key) already serves the lookup.
+    for index in inspect(conn).get_indexes(table):
+        if index["column_names"][:len(columns)] == columns:
+            return
+    conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+
+
+def backfill_itineraries(conn, trip_table, plan_column, day_table, activity_table):
+    trips = conn.execute(text(
+        f"SELECT id, {plan_column} FROM {trip_table} WHERE {plan_column} IS NOT NULL"
+    )).fetchall()
+    for trip_id, plan in trips:
+        # Plans may already be stored compressed (see compress_column)
+        plan = decompress_text(plan)
+        conn.execute(text(f"DELETE FROM {day_table} WHERE trip_id = :id"), {"id": trip_id})
+        conn.execute(text(f"DELETE FROM {activity_table} WHERE trip_id = :id"), {"id": trip_id})
+        for day_number, title, content, activities in itinerary_rows(plan):
+            conn.execute(text(
+                f"INSERT INTO {day_table} (trip_id, day_number, title, content)"
+                " VALUES (:trip_id, :day_number, :title, :content)"
+            ), {"trip_id": trip_id, "day_number": day_number, "title": title[:255], "content": content})
+            for slot, position, description in activities:
+                conn.execute(text(
+                    f"INSERT INTO {activity_table} (trip_id, day_number, slot, position, description)"
+                    " VALUES (:trip_id, :day_number, :slot, :position, :description)"
+                ), {"trip_id": trip_id, "day_number": day_number, "slot": slot,
+                    "position": position, "description": description})
+
+
+def compress_column(conn, table, column, batch_size=500):
+    # Rows already compressed are skipped, so this can be re-run safely
+    last_id = 0
+    while True:
+        rows = conn.execute(text(
+            f"SELECT id, {column} FROM {table} WHERE id > :last_id AND {column} IS NOT NULL"
+            " ORDER BY id LIMIT :limit"
+        ), {"last_id": last_id, "limit": batch_size}).fetchall()
+        if not rows:
+            return
+        for row_id, value in rows:
+            if not is_compressed(value):
+                plain = value.decode("utf-8") if isinstance(value, (bytes, bytearray)) else value
+                conn.execute(text(f"UPDATE {table} SET {column} = :value WHERE id = :id"),
+                             {"value": compress_text(plain), "id": row_id})
+        last_id = rows[-1][0]
+
+
+# =========================
+# MYSQL (server.py)
+# =========================
+def mysql_baseline(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS user (
+            id INTEGER NOT NULL AUTO_INCREMENT,
+            full_name VARCHAR(100) NOT NULL,
+            email VARCHAR(120) NOT NULL,
+            password_hash VARCHAR(255) NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            UNIQUE (email)
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS trip (
+            id INTEGER NOT NULL AUTO_INCREMENT,
+            user_id INTEGER NOT NULL,
+            name VARCHAR(100) NOT NULL,
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL,
+            description TEXT,
+            destination VARCHAR(100),
+            PRIMARY KEY (id),
+            FOREIGN KEY (user_id) REFERENCES user (id)
+        )
+    """))
+
+
+def mysql_trip_plan_details(conn):
+    # Replaces update_db.py / update_schema.py
+    if not has_column(conn, "trip", "plan_details"):
+        conn.execute(text("ALTER TABLE trip ADD COLUMN plan_details TEXT"))
+
+
+def mysql_itinerary_tables(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS trip_day (
+            id INTEGER NOT NULL AUTO_INCREMENT,
+            trip_id INTEGER NOT NULL,
+            day_number INTEGER NOT NULL,
+            title VARCHAR(255),
+            content TEXT,
+            PRIMARY KEY (id),
+            UNIQUE KEY ix_trip_day_trip_id_day_number (trip_id, day_number),
+            FOREIGN KEY (trip_id) REFERENCES trip (id)
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS activity (
+            id INTEGER NOT NULL AUTO_INCREMENT,
+            trip_id INTEGER NOT NULL,
+            day_number INTEGER NOT NULL,
+            slot VARCHAR(20),
+            position INTEGER NOT NULL DEFAULT 0,
+            description TEXT,
+            PRIMARY KEY (id),
+            KEY ix_activity_trip_id_day_number (trip_id, day_number),
+            FOREIGN KEY (trip_id) REFERENCES trip (id)
+        )
+    """))
+
+
+def mysql_backfill_itineraries(conn):
+    backfill_itineraries(conn, "trip", "plan_details", "trip_day", "activity")
+
+
+def mysql_trip_user_index(conn):
+    create_index_if_missing(conn, "trip", "ix_trip_user_id", ["user_id"])
+
+
+def mysql_trip_list_pagination(conn):
+    # updated_at feeds the trip list ETag; the composite index serves keyset pagination
+    if not has_column(conn, "trip", "updated_at"):
+        conn.execute(text("ALTER TABLE trip ADD COLUMN updated_at DATETIME"))
+        conn.execute(text("UPDATE trip SET updated_at = UTC_TIMESTAMP()"))
+    create_index_if_missing(conn, "trip", "ix_trip_user_id_start_date_id", ["user_id", "start_date", "id"])
+
+
+def mysql_compress_plans(conn):
+    # plan_details holds zlib-compressed bytes from now on (see compression.CompressedText)
+    conn.execute(text("ALTER TABLE trip MODIFY plan_details LONGBLOB"))
+    compress_column(conn, "trip", "plan_details")
+
+
+def mysql_trip_shares(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS trip_snapshot (
+            hash VARCHAR(64) NOT NULL,
+            trip_id INTEGER NOT NULL,
+            body LONGBLOB NOT NULL,
+            created_at DATETIME,
+            PRIMARY KEY (hash),
+            KEY ix_trip_snapshot_trip_id (trip_id),
+            FOREIGN KEY (trip_id) REFERENCES trip (id)
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS trip_share (
+            id INTEGER NOT NULL AUTO_INCREMENT,
+            trip_id INTEGER NOT NULL,
+            token VARCHAR(32) NOT NULL,
+            snapshot_hash VARCHAR(64),
+            created_at DATETIME,
+            PRIMARY KEY (id),
+            UNIQUE KEY ix_trip_share_token (token),
+            UNIQUE KEY ix_trip_share_trip_id (trip_id),
+            FOREIGN KEY (trip_id) REFERENCES trip (id)
+        )
+    """))
+
+
+def mysql_trip_budget(conn):
+    # Feeds the budget forecast; trips saved before this forecast as Flexible with no amount
+    if not has_column(conn, "trip", "budget_type"):
+        conn.execute(text("ALTER TABLE trip ADD COLUMN budget_type VARCHAR(20)"))
+    if not has_column(conn, "trip", "budget_amount"):
+        conn.execute(text("ALTER TABLE trip ADD COLUMN budget_amount FLOAT"))
+
+
+def mysql_admin_stats(conn):
+    # Where a trip's plan came from; plans saved before this count as model plans
+    if not has_column(conn, "trip", "plan_source"):
+        conn.execute(text("ALTER TABLE trip ADD COLUMN plan_source VARCHAR(10)"))
+        conn.execute(text("UPDATE trip SET plan_source = 'model' WHERE plan_details IS NOT NULL"))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS stat_counter (
+            name VARCHAR(32) NOT NULL,
+            value BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (name)
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS stat_signup_day (
+            day DATE NOT NULL,
+            signups INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day)
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS stat_destination (
+            destination VARCHAR(100) NOT NULL,
+            trips INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (destination),
+            KEY ix_stat_destination_trips (trips)
+        )
+    """))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS stat_user_trips (
+            user_id INTEGER NOT NULL,
+            trips INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id)
+        )
+    """))
+    admin_stats.rebuild(conn)
+
+
+def mysql_trip_date_range_index(conn):
+    # Serves timeline / overlap queries: user_id equality, start_date range, end_date filter from the index
+    create_index_if_missing(conn, "trip", "ix_trip_user_id_start_date_end_date", ["user_id", "start_date", "end_date"])
+
+
+def mysql_revoked_tokens(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS revoked_token (
+            token_hash VARCHAR(64) NOT NULL,
+            expires_at DATETIME NOT NULL,
+            PRIMARY KEY (token_hash),
+            KEY ix_revoked_token_expires_at (expires_at)
+        )
+    """))
+
+
+def mysql_reparse_itineraries(conn):
+    # Rows stored before unslotted items, "Header:" sections and "Day N Title" were parsed
+    backfill_itineraries(conn, "trip", "plan_details", "trip_day", "activity")
+
+
+def mysql_saved_plan_counters(conn):
+    # The plan counters count saved trips, not generations; renamed to say so
+    for old, new in (("plans_model", "saved_plans_model"), ("plans_fallback", "saved_plans_fallback")):
+        conn.execute(text("UPDATE stat_counter SET name = :new WHERE name = :old"), {"old": old, "new": new})
+
+
+def mysql_clamp_long_trips(conn):
+    # Trips are limited to 366 days (MAX_TRIP_DAYS in server.py) and the overlap
+    # queries only scan that far back, so older, longer trips are shortened to fit
+    too_long = "DATEDIFF(end_date, start_date) >= 366"
+    ids = [row[0] for row in conn.execute(text(f"SELECT id FROM trip WHERE {too_long}"))]
+    if ids:
+        print(f"Shortening trips longer than 366 days to 366 days: {ids}")
+        conn.execute(text(f"UPDATE trip SET end_date = DATE_ADD(start_date, INTERVAL 365 DAY),"
+                          f" updated_at = UTC_TIMESTAMP() WHERE {too_long}"))
+
+
+MYSQL_MIGRATIONS = [
+    Migration(1, mysql_baseline),
+    Migration(2, mysql_trip_plan_details),
+    Migration(3, mysql_itinerary_tables),
+    Migration(4, mysql_backfill_itineraries),
+    Migration(5, mysql_trip_user_index),
+    Migration(6, mysql_trip_list_pagination),
+    Migration(7, mysql_compress_plans),
+    Migration(8, mysql_trip_shares),
+    Migration(9, mysql_trip_budget),
+    Migration(10, mysql_admin_stats),
+    Migration(11, mysql_trip_date_range_index),
+    Migration(12, mysql_revoked_tokens),
+    Migration(13, mysql_reparse_itineraries),
+    Migration(14, mysql_saved_plan_counters),
+    Migration(15, mysql_clamp_long_trips),
+]
+
+
+# =========================
+# SQLITE (ai_server.py)
+# =========================
+def sqlite_baseline(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS trips (
+            id INTEGER NOT NULL,
+            city VARCHAR,
+            country VARCHAR,
+            budget_type VARCHAR,
+            "plan" TEXT,
+            PRIMARY KEY (id)
+        )
+    """))
+
+
+def sqlite_itinerary_tables(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS trip_days (
+            id INTEGER NOT NULL,
+            trip_id INTEGER NOT NULL REFERENCES trips (id),
+            day_number INTEGER NOT NULL,
+            title VARCHAR,
+            content TEXT,
+            PRIMARY KEY (id)
+        )
+    """))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_trip_days_trip_id_day_number ON trip_days (trip_id, day_number)"
+    ))
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS activities (
+            id INTEGER NOT NULL,
+            trip_id INTEGER NOT NULL REFERENCES trips (id),
+            day_number INTEGER NOT NULL,
+            slot VARCHAR,
+            position INTEGER NOT NULL DEFAULT 0,
+            description TEXT,
+            PRIMARY KEY (id)
+        )
+    """))
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_activities_trip_id_day_number ON activities (trip_id, day_number)"
+    ))
+
+
+def sqlite_backfill_itineraries(conn):
+    backfill_itineraries(conn, "trips", '"plan"', "trip_days", "activities")
+
+
+def sqlite_ai_jobs(conn):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS ai_jobs (
+            id VARCHAR(32) NOT NULL,
+            client_key VARCHAR(255),
+            status VARCHAR(20) NOT NULL,
+            request TEXT NOT NULL,
+            "plan" TEXT,
+            fallback BOOLEAN NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at DATETIME NOT NULL,
+            updated_at DATETIME NOT NULL,
+            PRIMARY KEY (id)
+        )
+    """))
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_ai_jobs_client_key ON ai_jobs (client_key)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_ai_jobs_status ON ai_jobs (status)"))
+
+
+def sqlite_compress_plans(conn):
+    # SQLite keeps the compressed bytes as BLOBs in the existing TEXT columns
+    compress_column(conn, "trips", '"plan"')
+    compress_column(conn, "ai_jobs", '"plan"')
+
+
+def sqlite_ai_job_attempts(conn):
+    # How many times a job has been run; jobs are failed after JOB_MAX_ATTEMPTS
+    if not has_column(conn, "ai_jobs", "attempts"):
+        conn.execute(text("ALTER TABLE ai_jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0"))
+
+
+def sqlite_reparse_itineraries(conn):
+    # Rows stored before unslotted items, "Header:" sections and "Day N Title" were parsed
+    backfill_itineraries(conn, "trips", '"plan"', "trip_days", "activities")
+
+
+SQLITE_MIGRATIONS = [
+    Migration(1, sqlite_baseline),
+    Migration(2, sqlite_itinerary_tables),
+    Migration(3, sqlite_backfill_itineraries),
+    Migration(4, sqlite_ai_jobs),
+    Migration(5, sqlite_compress_plans),
+    Migration(6, sqlite_ai_job_attempts),
+    Migration(7, sqlite_reparse_itineraries),
+]
+
+
+# =========================
+# RUNNER
+# =========================
+def ensure_version_table(engine):
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER NOT NULL PRIMARY KEY,
+                name VARCHAR(255) NOT NULL,
+                checksum VARCHAR(64) NOT NULL,
+                applied_at DATETIME NOT NULL
+            )
+        """))
+
+
+def applied_versions(engine):
+    if not inspect(engine).has_table("schema_migrations"):
+        return {}
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT version, name, checksum FROM schema_migrations")).fetchall()
+    return {row[0]: (row[1], row[2]) for row in rows}
+
+
+def check_drift(migrations, applied):
+    known = {m.version: m for m in migrations}
+    for version, (name, checksum) in sorted(applied.items()):
+        migration = known.get(version)
+        if migration is None:
+            raise MigrationError(f"Database has migration {version} ({name}) that this code does not know about")
+        if migration.checksum != checksum:
+            raise MigrationError(f"Migration {version} ({name}) was changed after it was applied")
+
+
+def verify_schema(engine, metadata):
+    """Fail if any table or column the models expect is missing from the database."""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    for table in metadata.sorted_tables:
+        if table.name not in tables:
+            raise MigrationError(f"Table '{table.name}' is missing; run python migrations.py")
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        missing = [c.name for c in table.columns if c.name not in columns]
+        if missing:
+            raise MigrationError(f"Table '{table.name}' is missing columns {missing}; run python migrations.py")
+
+
+def apply_migrations(engine, migrations, metadata=None):
+    ensure_version_table(engine)
+    applied = applied_versions(engine)
+    check_drift(migrations, applied)
+
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version in applied:
+            continue
+        print(f"Applying migration {migration.version}: {migration.name}")
+        with engine.begin() as conn:
+            migration.fn(conn)
+            conn.execute(text(
+                "INSERT INTO schema_migrations (version, name, checksum, applied_at)"
+                " VALUES (:version, :name, :checksum, :applied_at)"
+            ), {"version": migration.version, "name": migration.name,
+                "checksum": migration.checksum, "applied_at": datetime.datetime.utcnow()})
+
+    if metadata is not None:
+        verify_schema(engine, metadata)
+
+
+def print_status(label, engine, migrations):
+    applied = applied_versions(engine)
+    print(f"{label}:")
+    for migration in migrations:
+        state = "applied" if migration.version in applied else "pending"
+        print(f"  {migration.version:>3} {migration.name:<32} {state}")
+
+
+def main(argv):
+    targets = [a for a in argv if a in ("mysql", "sqlite")] or ["mysql", "sqlite"]
+    status_only = "status" in argv
+
+    for target in targets:
+        try:
+            if target == "mysql":
+                import server
+                with server.app.app_context():
+                    engine, migrations, metadata = server.db.engine, MYSQL_MIGRATIONS, server.db.metadata
+            else:
+                import ai_server
+                engine, migrations, metadata = ai_server.engine, SQLITE_MIGRATIONS, ai_server.Base.metadata
+
+            if status_only:
+                print_status(target, engine, migrations)
+            else:
+                apply_migrations(engine, migrations, metadata)
+                print(f"{target}: schema is up to date.")
+        except Exception as e:
+            print(f"{target}: migration failed: {e}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,68 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# =========================
+# PASSWORD HASHING POOL
+# =========================
+# Password hashes are deliberately CPU-heavy. Running them in a small process
+# pool caps how many cores a login/register burst can take, so the rest of
+# the app keeps serving requests.
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+
+_executor = None
+_workers = max(1, (os.cpu_count() or 2) // 2)
+_lock = threading.Lock()
+
+
+def configure(workers):
+    """Set the pool size. Takes effect on the next hash if the pool was already running."""
+    global _executor, _workers
+    with _lock:
+        _workers = max(1, int(workers))
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+def _pool():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=_workers)
+        return _executor
+
+
+def hash_password(password, method=DEFAULT_METHOD):
+    return _pool().submit(generate_password_hash, password, method).result()
+
+
+def verify_password(password_hash, password):
+    return _pool().submit(check_password_hash, password_hash, password).result()
+
+
+def _cost(method):
+    """Return (family, cost) for a werkzeug method string such as 'scrypt:32768:8:1'."""
+    parts = method.split(":")
+    family = parts[0]
+    if family == "scrypt":
+        # n * r * p is proportional to the work done
+        n, r, p = (int(x) for x in (parts[1:] + ["32768", "8", "1"])[:3])
+        return family, n * r * p
+    if family == "pbkdf2":
+        iterations = int(parts[2]) if len(parts) > 2 else 0
+        return f"pbkdf2:{parts[1] if len(parts) > 1 else 'sha256'}", iterations
+    return family, 0
+
+
+def needs_rehash(password_hash, method=DEFAULT_METHOD):
+    """True if a stored hash uses another algorithm or a lower cost than `method`."""
+    stored_method = password_hash.split("$", 1)[0]
+    try:
+        stored_family, stored_cost = _cost(stored_method)
+        family, cost = _cost(method)
+    except ValueError:
+        return True
+    return stored_family != family or stored_cost < cost
@@ -0,0 +1,235 @@
+import re
+
+# =========================
+# STRUCTURED PLAN MODEL
+# =========================
+# Plans are plain text in the layout the mock plan uses:
+#
+#   Day 1: Title
+#   Morning:
+#   - Activity – description
+#   Afternoon:
+#   ...
+#
+# parse_plan() turns that into {"preamble": str, "days": [day, ...]} where
+# each day is {"day": int, "title": str, "slots": {slot: [items]}, "text": str}.
+# "text" keeps the original block so untouched days round-trip unchanged.
+
+# "Day 1: Paris", "Day 1 - Paris", "**Day 1** Paris", "Day 1"
+DAY_RE = re.compile(r"^[\s#*]*Day\s+(\d+)\b[\s*]*(?:[:\-–.)][\s*]*)?(.*?)[\s*]*$", re.IGNORECASE)
+SLOT_RE = re.compile(
+    r"^[\s#*]*(Morning|Afternoon|Evening|Night|Food|Breakfast|Lunch|Dinner)[\s*]*:[\s*]*(.*)$",
+    re.IGNORECASE,
+)
+# Any other short "Header:" line that is not a list item, e.g. "Tips:" or "Getting around:"
+HEADER_RE = re.compile(r"^[\s#*]*([A-Za-z][\w'&/ ]{0,30}?)[\s*]*:[\s*]*(.*)$")
+LIST_MARKER_RE = re.compile(r"^\s*(?:[-•*]|\d+[.)])\s*")
+# Items that come before any header
+DEFAULT_SLOT = "Activities"
+
+MAX_DAY_RANGE = 366
+# Most days one instruction may add ("add 2 more days", "add day 9")
+MAX_ADDED_DAYS = 14
+
+ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5,
+    "sixth": 6, "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10,
+}
+COUNT_WORDS = {"a": 1, "an": 1, "one": 1, "another": 1, "two": 2, "three": 3, "four": 4, "five": 5}
+
+ADD_RE = re.compile(r"\b(add|append|extend|another|extra|additional)\b")
+COUNT_RE = re.compile(
+    r"\b(?:add|append|by)\s+(\d+|a|an|one|another|two|three|four|five)\s+"
+    r"(?:more\s+|extra\s+|additional\s+|new\s+)?days?\b"
+)
+# "remove day 2", "delete days 3 and 4", "drop the last day"
+REMOVE_RE = re.compile(
+    r"\b(?:remove|delete|drop|cut)\s+(?:the\s+)?"
+    r"(days?\s+\d+(?:\s*(?:,|&|and|-|–|to|through)\s*\d+)*|\w+\s+day\b)"
+)
+
+
+def _parse_day(number, title, lines):
+    slots = {}
+    current = None
+    for line in lines:
+        header = SLOT_RE.match(line) or (not LIST_MARKER_RE.match(line) and HEADER_RE.match(line))
+        if header:
+            current = header.group(1).strip().capitalize()
+            slots.setdefault(current, [])
+            if header.group(2).strip():
+                slots[current].append(header.group(2).strip())
+        elif line.strip():
+            item = LIST_MARKER_RE.sub("", line).strip()
+            if item:
+                slots.setdefault(current or DEFAULT_SLOT, []).append(item)
+    text = "\n".join([f"Day {number}: {title}".rstrip()] + lines).strip()
+    return {"day": number, "title": title.strip(), "slots": slots, "text": text}
+
+
+def parse_plan(text):
+    preamble = []
+    days = []
+    current = None
+    for line in (text or "").splitlines():
+        day_match = DAY_RE.match(line)
+        if day_match:
+            if current:
+                days.append(_parse_day(*current))
+            current = (int(day_match.group(1)), day_match.group(2), [])
+        elif current:
+            current[2].append(line)
+        else:
+            preamble.append(line)
+    if current:
+        days.append(_parse_day(*current))
+    return {"preamble": "\n".join(preamble).strip(), "days": days}
+
+
+def render_plan(plan):
+    blocks = [plan["preamble"]] if plan["preamble"] else []
+    blocks += [day["text"] for day in plan["days"]]
+    return "\n\n".join(blocks) + "\n"
+
+
+def _named_days(text, low, high):
+    # Ranges are clamped to [low, high], so "days 1 to 30000000" stays cheap
+    named = set()
+    for start, end in re.findall(r"days?\s+(\d+)\s*(?:-|–|to|through)\s*(\d+)", text):
+        named.update(range(max(int(start), low), min(int(end), high) + 1))
+    for group in re.findall(r"days?\s+((?:\d+\s*(?:,|and|&)?\s*)+)", text):
+        named.update(n for n in map(int, re.findall(r"\d+", group)) if low <= n <= high)
+    for word, number in ORDINALS.items():
+        if re.search(rf"\b{word}\s+day\b", text) and low <= number <= high:
+            named.add(number)
+    return named
+
+
+def plan_edit_scope(instruction, day_numbers):
+    """Split an instruction into (days to edit, days to add, days to remove).
+
+    "Add a third day" or "add 2 more days" adds days after the last one,
+    "remove day 2" or "drop the last day" removes existing days. Edits that
+    name no day and neither add nor remove anything apply to every day.
+    """
+    text = instruction.lower()
+    existing = set(day_numbers)
+    first, last = (min(existing), max(existing)) if existing else (1, 0)
+
+    named = _named_days(text, first, last + MAX_ADDED_DAYS)
+    if existing and re.search(r"\b(last|final)\s+day\b", text):
+        named.add(last)
+
+    added = set()
+    if ADD_RE.search(text):
+        added = {n for n in named if n > last}
+        count = COUNT_RE.search(text)
+        if not added and count and not named & existing:
+            amount = COUNT_WORDS.get(count.group(1)) or int(count.group(1))
+            added = set(range(last + 1, last + 1 + min(amount, MAX_ADDED_DAYS)))
+
+    removed = set()
+    for fragment in REMOVE_RE.findall(text):
+        removed |= _named_days(fragment, first, last) & existing
+        if re.search(r"\b(last|final)\s+day\b", fragment) and existing:
+            removed.add(last)
+
+    targets = (named & existing) - removed
+    if not (targets or added or removed):
+        targets = existing
+    return sorted(targets), sorted(added), sorted(removed)
+
+
+def edit_plan(plan, edited_text, targets, added=(), removed=()):
+    """Apply a partial edit: patch targeted days, append added ones, drop removed ones.
+
+    Raises ValueError when days were asked for but the edited text has none of them.
+    """
+    wanted = set(targets) | set(added)
+    # Days the model echoed or renumbered outside the request are ignored
+    days = [day for day in parse_plan(edited_text)["days"] if day["day"] in wanted]
+    if wanted and not days:
+        raise ValueError("Model response did not contain any of the requested 'Day N:' sections")
+    kept = {"preamble": plan["preamble"], "days": [day for day in plan["days"] if day["day"] not in removed]}
+    merged = merge_days(kept, days)
+    return renumber_days(merged) if removed else merged
+
+
+def renumber_days(plan):
+    """Number days 1..N in order, rewriting each day's header line."""
+    days = []
+    for number, day in enumerate(plan["days"], start=1):
+        if day["day"] != number:
+            body = day["text"].split("\n", 1)[1:]
+            day = {**day, "day": number, "text": "\n".join([f"Day {number}: {day['title']}".rstrip()] + body)}
+        days.append(day)
+    return {"preamble": plan["preamble"], "days": days}
+
+
+def merge_days(plan, new_days):
+    """Patch edited days into a plan by day number; unknown numbers are appended."""
+    by_number = {day["day"]: day for day in new_days}
+    merged = [by_number.pop(day["day"], day) for day in plan["days"]]
+    merged += sorted(by_number.values(), key=lambda day: day["day"])
+    return {"preamble": plan["preamble"], "days": merged}
+
+
+def diff_plans(old, new):
+    old_days = {day["day"]: day for day in old["days"]}
+    new_days = {day["day"]: day for day in new["days"]}
+    changes = []
+    for number in sorted(set(old_days) | set(new_days)):
+        before, after = old_days.get(number), new_days.get(number)
+        if before is None:
+            changes.append({"day": number, "type": "added", "title": after["title"], "slots": after["slots"]})
+        elif after is None:
+            changes.append({"day": number, "type": "removed", "title": before["title"]})
+        elif before["text"] != after["text"]:
+            slots = {}
+            for slot in list(before["slots"]) + [s for s in after["slots"] if s not in before["slots"]]:
+                old_items = before["slots"].get(slot, [])
+                new_items = after["slots"].get(slot, [])
+                if old_items != new_items:
+                    slots[slot] = {"before": old_items, "after": new_items}
+            change = {"day": number, "type": "modified", "slots": slots}
+            if before["title"] != after["title"]:
+                change["title"] = {"before": before["title"], "after": after["title"]}
+            changes.append(change)
+    return changes
+
+
+def itinerary_rows(text):
+    """Flatten a plan into (day_number, title, content, activities) tuples for storage.
+
+    activities is a list of (slot, position, description).
+    """
+    rows = []
+    seen = set()
+    for day in parse_plan(text)["days"]:
+        if day["day"] in seen:
+            continue
+        seen.add(day["day"])
+        activities = [
+            (slot, position, item)
+            for slot, items in day["slots"].items()
+            for position, item in enumerate(items)
+        ]
+        rows.append((day["day"], day["title"], day["text"], activities))
+    return rows
+
+
+def parse_day_range(value):
+    """Parse "3", "3-5" or "1,4,6-7" into a sorted list of day numbers."""
+    numbers = set()
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (int(n) for n in part.split("-", 1))
+            if end - start > MAX_DAY_RANGE:
+                raise ValueError(f"Day range {part} is too large")
+            numbers.update(range(start, end + 1))
+        else:
+            numbers.add(int(part))
+    return sorted(numbers)
@@ -0,0 +1,56 @@
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+# =========================
+# SHARE SNAPSHOTS
+# =========================
+# A shared trip is rendered to JSON once, when it is shared or edited, and
+# stored under the sha256 of that JSON. The hash is the snapshot's URL and
+# ETag, so a snapshot never changes and can be cached forever. Bodies are
+# kept here with a pre-gzipped copy, so views don't re-serialize or
+# re-compress anything.
+
+
+def render_snapshot(payload):
+    """Return (content_hash, body) for a snapshot payload."""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(body).hexdigest(), body
+
+
+class SnapshotCache:
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, content_hash):
+        """Return (body, gzipped_body) or None."""
+        with self._lock:
+            entry = self._entries.get(content_hash)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(content_hash)
+            self.stats["hits"] += 1
+            return entry
+
+    def put(self, content_hash, body):
+        entry = (body, gzip.compress(body, compresslevel=9))
+        with self._lock:
+            self._entries[content_hash] = entry
+            self._entries.move_to_end(content_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def discard(self, content_hash):
+        with self._lock:
+            self._entries.pop(content_hash, None)
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries)}
@@ -0,0 +1,115 @@
+import asyncio
+
+# =========================
+# SINGLE-FLIGHT COALESCING
+# =========================
+# Concurrent requests with the same key share one upstream call. The call
+# runs in its own task, so a caller that disconnects (and is cancelled)
+# never cancels the work the other callers are waiting on.
+
+
+class _Broadcast:
+    """Buffers a stream of events so any number of subscribers can replay it."""
+
+    def __init__(self, loop):
+        self._loop = loop
+        self.items = []
+        self.finished = False
+        self.error = None
+        self.opened = loop.create_future()
+        self._signal = loop.create_future()
+
+    def _notify(self):
+        signal, self._signal = self._signal, self._loop.create_future()
+        signal.set_result(None)
+
+    def publish(self, item):
+        self.items.append(item)
+        self._notify()
+
+    def finish(self, error=None):
+        self.error = error
+        self.finished = True
+        self._notify()
+
+    async def subscribe(self):
+        index = 0
+        while True:
+            while index < len(self.items):
+                yield self.items[index]
+                index += 1
+            if self.finished:
+                if self.error is not None:
+                    raise self.error
+                return
+            await asyncio.shield(self._signal)
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._streams = {}
+        self.stats = {"leaders": 0, "coalesced": 0, "shared_failures": 0}
+
+    async def do(self, key, factory):
+        """Await `factory()` once per key; concurrent callers share its result or error."""
+        task = self._calls.get(key)
+        if task is None:
+            self.stats["leaders"] += 1
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.stats["coalesced"] += 1
+
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.stats["shared_failures"] += 1
+            raise
+
+    async def stream(self, key, open_stream):
+        """Share one event stream per key.
+
+        `open_stream()` must return an async iterator. Errors raised while
+        opening it (e.g. a scheduler rejection) are raised to every caller
+        here, before any event is produced.
+        """
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            self.stats["leaders"] += 1
+            broadcast = _Broadcast(asyncio.get_running_loop())
+            self._streams[key] = broadcast
+            asyncio.ensure_future(self._pump(key, broadcast, open_stream))
+        else:
+            self.stats["coalesced"] += 1
+
+        await asyncio.shield(broadcast.opened)
+        return broadcast.subscribe()
+
+    async def _pump(self, key, broadcast, open_stream):
+        try:
+            try:
+                events = await open_stream()
+            except Exception as e:
+                broadcast.opened.set_exception(e)
+                broadcast.finish(e)
+                return
+            broadcast.opened.set_result(None)
+            try:
+                async for item in events:
+                    broadcast.publish(item)
+            except Exception as e:
+                broadcast.finish(e)
+                return
+            broadcast.finish()
+        finally:
+            self._streams.pop(key, None)
+
+    def snapshot(self):
+        return {
+            **self.stats,
+            "in_flight": len(self._calls) + len(self._streams),
+        }
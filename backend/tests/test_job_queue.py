@@ -0,0 +1,69 @@
+import asyncio
+
+from job_queue import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JobQueue
+from llm_scheduler import SchedulerRejected
+
+
+async def events(*items):
+    for item in items:
+        yield item
+
+
+def run_queue(handler, job_id="job", attempts=0, **options):
+    saved = []
+
+    def save(job_id, status, result=None, error=None, attempts=None):
+        saved.append((status, attempts, error))
+
+    async def main():
+        queue = JobQueue(handler, save, workers=1, retry_delay=0.001, max_retry_delay=0.01, **options)
+        queue.start([(job_id, attempts)])
+        while job_id in queue._live:
+            await asyncio.sleep(0.001)
+        await queue.stop()
+        return queue
+
+    return asyncio.run(main()), saved
+
+
+def test_job_fails_after_max_attempts():
+    calls = []
+
+    async def handler(job_id):
+        calls.append(job_id)
+        raise Exception("model error")
+
+    queue, saved = run_queue(handler, max_attempts=3)
+    assert len(calls) == 3
+    assert [status for status, _, _ in saved] == [JOB_RUNNING, JOB_QUEUED] * 2 + [JOB_RUNNING, JOB_FAILED]
+    assert [attempts for status, attempts, _ in saved if status == JOB_RUNNING] == [1, 2, 3]
+    assert saved[-1][2] == "Gave up after 3 attempts: model error"
+    assert queue.stats["retried"] == 2 and queue.stats["failed"] == 1
+
+
+def test_attempts_survive_a_restart():
+    async def handler(job_id):
+        raise SchedulerRejected("busy", 503, 0)
+
+    _, saved = run_queue(handler, attempts=4, max_attempts=5)
+    assert [status for status, _, _ in saved] == [JOB_RUNNING, JOB_FAILED]
+
+
+def test_retried_job_can_succeed():
+    calls = []
+
+    async def handler(job_id):
+        calls.append(job_id)
+        if len(calls) == 1:
+            raise SchedulerRejected("busy", 503, 0)
+        return events(("chunk", "Day 1"), ("done", {"plan": "Day 1", "fallback": False}))
+
+    queue, saved = run_queue(handler, max_attempts=3)
+    assert saved[-1][0] == JOB_DONE
+    assert queue.stats["done"] == 1 and queue.stats["failed"] == 0
+
+
+def test_backoff_doubles_and_is_capped():
+    queue = JobQueue(None, None, retry_delay=5, max_retry_delay=60)
+    assert [queue.backoff(n) for n in (1, 2, 3, 4, 5)] == [5, 10, 20, 40, 60]
+    assert queue.backoff(1, retry_after=30) == 30
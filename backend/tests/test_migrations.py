@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+import migrations
+from migrations import (
+    SQLITE_MIGRATIONS, Migration, MigrationError, apply_migrations, applied_versions, check_drift, print_status,
+)
+
+
+def create_notes(conn):
+    conn.execute(text("CREATE TABLE notes (id INTEGER PRIMARY KEY)"))
+
+
+def add_note_body(conn):
+    conn.execute(text("ALTER TABLE notes ADD COLUMN body TEXT"))
+
+
+def add_note_body_edited(conn):
+    conn.execute(text("ALTER TABLE notes ADD COLUMN body VARCHAR(200)"))
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+
+
+def test_checksum_follows_the_source():
+    assert Migration(2, add_note_body).checksum == Migration(2, add_note_body).checksum
+    assert Migration(2, add_note_body).checksum != Migration(2, add_note_body_edited).checksum
+
+
+def test_apply_runs_pending_migrations_once(engine):
+    steps = [Migration(1, create_notes), Migration(2, add_note_body)]
+    apply_migrations(engine, steps)
+    apply_migrations(engine, steps)
+    assert sorted(applied_versions(engine)) == [1, 2]
+    assert [c["name"] for c in inspect(engine).get_columns("notes")] == ["id", "body"]
+
+
+def test_edited_migration_is_drift(engine):
+    apply_migrations(engine, [Migration(1, create_notes), Migration(2, add_note_body)])
+    with pytest.raises(MigrationError, match="changed after it was applied"):
+        apply_migrations(engine, [Migration(1, create_notes), Migration(2, add_note_body_edited)])
+
+
+def test_unknown_applied_migration_is_drift():
+    with pytest.raises(MigrationError, match="does not know about"):
+        check_drift([Migration(1, create_notes)], {1: ("create_notes", Migration(1, create_notes).checksum),
+                                                   7: ("gone", "abc")})
+
+
+def test_status_changes_nothing(engine, capsys):
+    print_status("test", engine, [Migration(1, create_notes)])
+    assert "pending" in capsys.readouterr().out
+    assert inspect(engine).get_table_names() == []
+
+
+def test_sqlite_migrations_build_the_ai_server_schema(engine):
+    apply_migrations(engine, SQLITE_MIGRATIONS)
+    tables = set(inspect(engine).get_table_names())
+    assert {"trips", "trip_days", "activities", "ai_jobs", "schema_migrations"} <= tables
+    assert "attempts" in {c["name"] for c in inspect(engine).get_columns("ai_jobs")}
+
+
+def test_status_cli_does_not_migrate_trips_db(tmp_path, monkeypatch, capsys):
+    # ai_server opens trips.db relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    assert migrations.main(["sqlite", "status"]) == 0
+    assert "pending" in capsys.readouterr().out
+    assert inspect(create_engine("sqlite:///trips.db")).get_table_names() == []
@@ -0,0 +1,101 @@
+import pytest
+
+from plan_structure import diff_plans, edit_plan, parse_plan, plan_edit_scope, render_plan
+
+PLAN = """Your trip to Paris
+
+Day 1: Arrival
+Morning:
+- Louvre – paintings
+Evening:
+- Seine cruise – boats
+
+Day 2: Montmartre
+Morning:
+- Sacre-Coeur – views
+Evening:
+- Cabaret – show
+"""
+
+
+def test_scope_edits_named_days():
+    assert plan_edit_scope("Make day 2 evening more relaxed", [1, 2]) == ([2], [], [])
+    assert plan_edit_scope("Change the first day", [1, 2]) == ([1], [], [])
+
+
+def test_scope_defaults_to_every_day():
+    assert plan_edit_scope("Make it cheaper", [1, 2]) == ([1, 2], [], [])
+    assert plan_edit_scope("Change day 9", [1, 2]) == ([1, 2], [], [])
+
+
+def test_scope_adds_days():
+    assert plan_edit_scope("Add a third day", [1, 2]) == ([], [3], [])
+    assert plan_edit_scope("Add 2 more days in Lyon", [1, 2]) == ([], [3, 4], [])
+    assert plan_edit_scope("Add another day", [1, 2]) == ([], [3], [])
+
+
+def test_scope_adding_to_an_existing_day_is_an_edit():
+    assert plan_edit_scope("Add a museum to day 2", [1, 2]) == ([2], [], [])
+
+
+def test_scope_removes_days():
+    assert plan_edit_scope("Remove day 2", [1, 2, 3]) == ([], [], [2])
+    assert plan_edit_scope("Drop the last day", [1, 2, 3]) == ([], [], [3])
+    assert plan_edit_scope("Remove the museum from day 2", [1, 2, 3]) == ([2], [], [])
+
+
+def test_scope_clamps_huge_ranges():
+    targets, added, removed = plan_edit_scope("Edit days 1 to 30000000", [1, 2])
+    assert targets == [1, 2] and added == [] and removed == []
+
+
+def test_edit_patches_only_targeted_days():
+    plan = parse_plan(PLAN)
+    edited = "Day 2: Quiet Montmartre\nEvening:\n- Wine bar – calm\n\nDay 1: Echoed\nMorning:\n- Nope"
+    merged = edit_plan(plan, edited, [2])
+    assert [day["title"] for day in merged["days"]] == ["Arrival", "Quiet Montmartre"]
+    assert merged["days"][1]["slots"] == {"Evening": ["Wine bar – calm"]}
+    assert render_plan(merged).startswith("Your trip to Paris\n\nDay 1: Arrival")
+
+
+def test_edit_appends_added_days():
+    plan = parse_plan(PLAN)
+    merged = edit_plan(plan, "Day 3: Versailles\nMorning:\n- Palace – gardens", [], [3])
+    assert [day["day"] for day in merged["days"]] == [1, 2, 3]
+    assert [change["type"] for change in diff_plans(plan, merged)] == ["added"]
+
+
+def test_edit_removes_and_renumbers_days():
+    plan = parse_plan(PLAN + "\nDay 3: Versailles\nMorning:\n- Palace – gardens\n")
+    merged = edit_plan(plan, "", [], [], [2])
+    assert [(day["day"], day["title"]) for day in merged["days"]] == [(1, "Arrival"), (2, "Versailles")]
+    assert merged["days"][1]["text"].startswith("Day 2: Versailles\nMorning:")
+    assert parse_plan(render_plan(merged))["days"][1]["slots"] == {"Morning": ["Palace – gardens"]}
+
+
+def test_edit_without_requested_days_raises():
+    plan = parse_plan(PLAN)
+    with pytest.raises(ValueError):
+        edit_plan(plan, "Sorry, I can't help with that.", [2])
+
+
+def test_parse_keeps_items_before_any_slot():
+    day = parse_plan("Day 1: Paris\n- Arrive at CDG\nMorning:\n- Louvre")["days"][0]
+    assert day["slots"] == {"Activities": ["Arrive at CDG"], "Morning": ["Louvre"]}
+
+
+def test_parse_other_headers_start_sections():
+    day = parse_plan("Day 1: Paris\nMorning:\n- C\nTips:\n- bring water\n- Entry: 10 EUR")["days"][0]
+    assert day["slots"] == {"Morning": ["C"], "Tips": ["bring water", "Entry: 10 EUR"]}
+
+
+def test_parse_plain_lists_without_headers():
+    day = parse_plan("Day 1: Paris\n1. Louvre\n2. Eiffel Tower\nWalk along the Seine")["days"][0]
+    assert day["slots"] == {"Activities": ["Louvre", "Eiffel Tower", "Walk along the Seine"]}
+
+
+def test_parse_day_headers_without_separator():
+    plan = parse_plan("Intro\n**Day 1 Paris**\n- Louvre\n## Day 2\n- Versailles\nDay 3 - Lyon\n- Bouchon")
+    assert plan["preamble"] == "Intro"
+    assert [(day["day"], day["title"]) for day in plan["days"]] == [(1, "Paris"), (2, ""), (3, "Lyon")]
+    assert plan["days"][1]["slots"] == {"Activities": ["Versailles"]}
@@ -0,0 +1,115 @@
+import os
+import tempfile
+
+import pytest
+
+# server.py reads DATABASE_URL at import; the tests use a throwaway SQLite file
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "app.db")
+
+import server  # noqa: E402
+from auth_cache import TokenCache  # noqa: E402
+from share_snapshots import SnapshotCache, render_snapshot  # noqa: E402
+
+PLAN = "Day 1: Arrival\nMorning:\n- Louvre\n\nDay 2: Montmartre\nEvening:\n- Cabaret\n"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    with server.app.app_context():
+        server.db.drop_all()
+        server.db.create_all()
+    # Fresh in-process caches, since ids restart with every database
+    monkeypatch.setattr(server, "snapshot_cache", SnapshotCache())
+    monkeypatch.setattr(server, "token_cache", TokenCache(max_tokens=100, max_users=100))
+    return server.app.test_client()
+
+
+def login(client, email="ana@example.com"):
+    client.post("/api/auth/register", json={"email": email, "password": "secret-pass", "name": "Ana"})
+    token = client.post("/api/auth/login", json={"email": email, "password": "secret-pass"}).get_json()["token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_trip(client, headers, city="Paris", start="2026-05-01", end="2026-05-02"):
+    response = client.post("/api/trips", headers=headers, json={
+        "city": city, "startDate": start, "endDate": end, "final_plan": PLAN,
+    })
+    assert response.status_code == 201
+    return response.get_json()["trip_id"]
+
+
+def test_snapshot_hash_is_stable():
+    assert render_snapshot({"b": 1, "a": [1, 2]}) == render_snapshot({"a": [1, 2], "b": 1})
+    assert render_snapshot({"a": 1})[0] != render_snapshot({"a": 2})[0]
+
+
+def test_snapshot_is_served_and_revalidated(client):
+    headers = login(client)
+    trip_id = create_trip(client, headers)
+    content_hash = client.post(f"/api/trips/{trip_id}/share", headers=headers).get_json()["hash"]
+
+    response = client.get(f"/api/snapshots/{content_hash}")
+    assert response.status_code == 200
+    assert response.get_json()["days"][0]["title"] == "Arrival"
+    assert client.get(f"/api/snapshots/{content_hash}", headers={"If-None-Match": f'"{content_hash}"'}).status_code == 304
+
+
+def test_unshared_or_unknown_snapshot_is_not_found(client):
+    headers = login(client)
+    trip_id = create_trip(client, headers)
+    content_hash = client.post(f"/api/trips/{trip_id}/share", headers=headers).get_json()["hash"]
+    client.delete(f"/api/trips/{trip_id}/share", headers=headers)
+
+    conditional = {"If-None-Match": f'"{content_hash}"'}
+    assert client.get(f"/api/snapshots/{content_hash}", headers=conditional).status_code == 404
+    assert client.get("/api/snapshots/" + "0" * 64, headers={"If-None-Match": '"' + "0" * 64 + '"'}).status_code == 404
+
+
+def test_trip_list_pages_by_cursor(client):
+    headers = login(client)
+    ids = [create_trip(client, headers, start=f"2026-05-{day:02d}", end=f"2026-05-{day:02d}") for day in (3, 1, 2, 1)]
+
+    seen, cursor = [], None
+    while True:
+        response = client.get("/api/trips", headers=headers, query_string={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert response.headers["X-Total-Count"] == "4"
+        seen += [trip["id"] for trip in response.get_json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    # Ordered by (start_date, id)
+    assert seen == [ids[1], ids[3], ids[2], ids[0]]
+
+
+def test_trip_list_etag_is_weak_across_encodings(client, monkeypatch):
+    monkeypatch.setitem(server.app.config, "COMPRESSION_MIN_BYTES", 1)
+    headers = login(client)
+    create_trip(client, headers)
+
+    plain = client.get("/api/trips", headers={**headers, "Accept-Encoding": "identity"})
+    gzipped = client.get("/api/trips", headers={**headers, "Accept-Encoding": "gzip"})
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert plain.headers["ETag"] == gzipped.headers["ETag"] and plain.headers["ETag"].startswith("W/")
+    assert "Accept-Encoding" in gzipped.headers["Vary"]
+
+    revalidated = client.get("/api/trips", headers={**headers, "If-None-Match": gzipped.headers["ETag"]})
+    assert revalidated.status_code == 304
+
+    create_trip(client, headers, city="Rome")
+    assert client.get("/api/trips", headers={**headers, "If-None-Match": gzipped.headers["ETag"]}).status_code == 200
+
+
+def test_trips_longer_than_the_limit_are_rejected(client):
+    headers = login(client)
+    response = client.post("/api/trips", headers=headers, json={
+        "city": "Lisbon", "startDate": "2026-01-01", "endDate": "2027-01-02",
+    })
+    assert response.status_code == 400
+    create_trip(client, headers, start="2026-01-01", end="2027-01-01")
+
+    with server.app.app_context():
+        trip = server.Trip.query.first()
+        trip.end_date = trip.end_date.replace(year=2028)
+        with pytest.raises(ValueError, match="within 366 days"):
+            server.db.session.commit()
+        server.db.session.rollback()
@@ -1,7 +1,40 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
+import { Users, UserCheck, Map, Sparkles } from 'lucide-react';
+
+const panelStyle = { background: 'var(--surface)', borderRadius: 'var(--radius-lg)', boxShadow: 'var(--shadow-md)', padding: '2rem' };
 
 const AdminDashboard = () => {
+    const [stats, setStats] = useState(null);
+    const [error, setError] = useState('');
+
+    useEffect(() => {
+        // Served from summary tables, so this stays cheap however many users and trips there are
+        const fetchStats = async () => {
+            try {
+                const token = localStorage.getItem('token');
+                const res = await fetch('http://localhost:5000/api/admin/stats?days=30&top=10', {
+                    headers: { Authorization: `Bearer ${token}` }
+                });
+                const data = await res.json();
+                if (res.ok) setStats(data);
+                else setError(data.message);
+            } catch (err) {
+                setError('Could not load stats');
+            }
+        };
+        fetchStats();
+    }, []);
+
+    const cards = stats ? [
+        { label: 'Users', value: stats.users, icon: <Users size={24} /> },
+        { label: 'Active Users', value: stats.active_users, icon: <UserCheck size={24} /> },
+        { label: 'Trips', value: stats.trips, icon: <Map size={24} /> },
+        { label: 'Saved AI Plans (fallback)', value: `${stats.saved_plans.total} (${stats.saved_plans.fallback})`, icon: <Sparkles size={24} /> },
+    ] : [];
+    const maxSignups = stats ? Math.max(1, ...stats.signups_per_day.map((d) => d.signups)) : 1;
+    const maxTrips = stats && stats.top_destinations.length ? stats.top_destinations[0].trips : 1;
+
     return (
         <motion.div
             initial={{ opacity: 0 }}
@@ -12,9 +45,62 @@ const AdminDashboard = () => {
             <div className="section-header">
                 <h1>Admin Dashboard</h1>
             </div>
-            <div className="card-content" style={{ background: 'var(--surface)', borderRadius: 'var(--radius-lg)', boxShadow: 'var(--shadow-md)', padding: '2rem' }}>
-                <p style={{ color: 'var(--text-secondary)' }}>Welcome to the admin area. This section is under construction.</p>
-            </div>
+
+            {!stats ? (
+                <div className="card-content" style={panelStyle}>
+                    <p style={{ color: 'var(--text-secondary)' }}>{error || 'Loading stats...'}</p>
+                </div>
+            ) : (
+                <>
+                    <div className="stats-grid">
+                        {cards.map((card) => (
+                            <div key={card.label} className="card-content stat-card" style={panelStyle}>
+                                <div className="stat-icon">{card.icon}</div>
+                                <div>
+                                    <p style={{ color: 'var(--text-secondary)' }}>{card.label}</p>
+                                    <p className="stat-value">{card.value}</p>
+                                </div>
+                            </div>
+                        ))}
+                    </div>
+
+                    <div className="stats-grid" style={{ marginTop: '1.5rem' }}>
+                        <div className="card-content" style={panelStyle}>
+                            <h3 style={{ marginBottom: '1rem' }}>Signups, last 30 days</h3>
+                            {stats.signups_per_day.length === 0 && <p style={{ color: 'var(--text-secondary)' }}>No signups yet.</p>}
+                            {stats.signups_per_day.map((d) => (
+                                <div key={d.day} className="bar-row">
+                                    <span>{d.day}</span>
+                                    <div className="bar-bg"><div className="bar-fill" style={{ width: `${(d.signups / maxSignups) * 100}%` }} /></div>
+                                    <span>{d.signups}</span>
+                                </div>
+                            ))}
+                        </div>
+
+                        <div className="card-content" style={panelStyle}>
+                            <h3 style={{ marginBottom: '1rem' }}>Top Destinations</h3>
+                            {stats.top_destinations.length === 0 && <p style={{ color: 'var(--text-secondary)' }}>No trips yet.</p>}
+                            {stats.top_destinations.map((d) => (
+                                <div key={d.destination} className="bar-row">
+                                    <span>{d.destination}</span>
+                                    <div className="bar-bg"><div className="bar-fill" style={{ width: `${(d.trips / maxTrips) * 100}%` }} /></div>
+                                    <span>{d.trips}</span>
+                                </div>
+                            ))}
+                        </div>
+                    </div>
+                </>
+            )}
+
+            <style>{`
+        .stats-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(240px, 1fr)); gap: 1.5rem; }
+        .stat-card { display: flex; align-items: center; gap: 1rem; padding: 1.5rem !important; }
+        .stat-icon { width: 48px; height: 48px; border-radius: 12px; background: var(--primary); color: white; display: flex; align-items: center; justify-content: center; }
+        .stat-value { font-size: 1.5rem; font-weight: 700; }
+        .bar-row { display: grid; grid-template-columns: 110px 1fr 40px; align-items: center; gap: 0.75rem; margin-bottom: 0.5rem; font-size: 0.9rem; }
+        .bar-bg { height: 8px; background: #e2e8f0; border-radius: 4px; overflow: hidden; }
+        .bar-fill { height: 100%; background: var(--primary); border-radius: 4px; }
+      `}</style>
         </motion.div>
     );
 };
@@ -1,20 +1,53 @@
-import React, { useState } from 'react';
+import React, { useState, useEffect } from 'react';
+import { useParams } from 'react-router-dom';
 import { motion } from 'framer-motion';
-import { PieChart, Wallet, TrendingUp, AlertCircle, DollarSign } from 'lucide-react';
+import { Wallet, TrendingUp, AlertCircle, DollarSign } from 'lucide-react';
+
+const CATEGORY_COLORS = {
+    accommodation: '#ec4899',
+    food: '#f59e0b',
+    activities: '#10b981',
+    transport: '#8b5cf6',
+};
+
+const money = (value) => `$${Math.round(value).toLocaleString()}`;
 
 const Budget = () => {
-    const [budget] = useState({
-        total: 3500,
-        spent: 1250,
-        currency: '$',
-        breakdown: [
-            { category: 'Flights', amount: 800, color: '#6366f1' },
-            { category: 'Accommodation', amount: 1200, color: '#ec4899' },
-            { category: 'Food', amount: 600, color: '#f59e0b' },
-            { category: 'Activities', amount: 500, color: '#10b981' },
-            { category: 'Transport', amount: 400, color: '#8b5cf6' },
-        ]
-    });
+    const { tripId } = useParams();
+    const [forecast, setForecast] = useState(null);
+    const [loading, setLoading] = useState(true);
+    const [showDays, setShowDays] = useState(false);
+
+    // Projected locally by the server from its cost table, so it is cheap to refresh
+    const fetchForecast = async () => {
+        setLoading(true);
+        try {
+            const token = localStorage.getItem('token');
+            const res = await fetch(`http://localhost:5000/api/trips/${tripId}/budget-forecast`, {
+                headers: { Authorization: `Bearer ${token}` }
+            });
+            if (res.ok) setForecast(await res.json());
+        } catch (err) {
+            console.error(err);
+        } finally {
+            setLoading(false);
+        }
+    };
+
+    useEffect(() => {
+        if (tripId) fetchForecast();
+    }, [tripId]);
+
+    if (loading && !forecast) return <div className="container" style={{ paddingTop: '4rem' }}>Loading forecast...</div>;
+    if (!forecast) return <div className="container" style={{ paddingTop: '4rem' }}>Budget forecast not available.</div>;
+
+    const { total, budget } = forecast;
+    const scale = Math.max(total.high, budget ? budget.amount : 0) || 1;
+    const breakdown = Object.entries(forecast.categories).map(([category, band]) => ({
+        category: category.charAt(0).toUpperCase() + category.slice(1),
+        ...band,
+        color: CATEGORY_COLORS[category] || '#6366f1',
+    }));
 
     return (
         <div className="container" style={{ paddingBottom: '4rem' }}>
@@ -27,10 +60,10 @@ const Budget = () => {
                 <div className="flex-between" style={{ marginBottom: '2rem' }}>
                     <div>
                         <h1>Trip Budget</h1>
-                        <p className="text-secondary">Track your expenses and forecast costs.</p>
+                        <p className="text-secondary">Projected costs for your {forecast.day_count}-day trip.</p>
                     </div>
-                    <button className="btn btn-primary">
-                        <TrendingUp size={18} /> AI Forecast
+                    <button className="btn btn-primary" onClick={() => setShowDays(!showDays)}>
+                        <TrendingUp size={18} /> {showDays ? 'Hide Daily Forecast' : 'AI Forecast'}
                     </button>
                 </div>
 
@@ -40,15 +73,16 @@ const Budget = () => {
                         <div className="icon-box info"><Wallet size={24} /></div>
                         <div>
                             <h3>Total Budget</h3>
-                            <p className="amount">{budget.currency}{budget.total}</p>
+                            <p className="amount">{budget ? money(budget.amount) : 'Flexible'}</p>
                         </div>
                     </div>
 
                     <div className="budget-card">
                         <div className="icon-box warning"><DollarSign size={24} /></div>
                         <div>
-                            <h3>Spent So Far</h3>
-                            <p className="amount">{budget.currency}{budget.spent}</p>
+                            <h3>Expected Cost</h3>
+                            <p className="amount">{money(total.mean)}</p>
+                            <p className="text-secondary range">{money(total.low)} – {money(total.high)}</p>
                         </div>
                     </div>
 
@@ -56,7 +90,7 @@ const Budget = () => {
                         <div className="icon-box success"><TrendingUp size={24} /></div>
                         <div>
                             <h3>Remaining</h3>
-                            <p className="amount">{budget.currency}{budget.total - budget.spent}</p>
+                            <p className="amount">{budget ? money(budget.remaining) : '—'}</p>
                         </div>
                     </div>
                 </div>
@@ -64,8 +98,8 @@ const Budget = () => {
                 {/* Visual Breakdown */}
                 <h3 style={{ marginTop: '3rem', marginBottom: '1.5rem' }}>Expense Breakdown</h3>
                 <div className="breakdown-list">
-                    {budget.breakdown.map((item, index) => (
-                        <div key={index} className="breakdown-item">
+                    {breakdown.map((item, index) => (
+                        <div key={item.category} className="breakdown-item">
                             <div className="item-header">
                                 <span className="dot" style={{ background: item.color }}></span>
                                 <span>{item.category}</span>
@@ -73,20 +107,40 @@ const Budget = () => {
                             <div className="progress-bar-bg">
                                 <motion.div
                                     initial={{ width: 0 }}
-                                    animate={{ width: `${(item.amount / budget.total) * 100}%` }}
+                                    animate={{ width: `${(item.mean / scale) * 100}%` }}
                                     transition={{ duration: 1, delay: index * 0.1 }}
                                     className="progress-bar-fill"
                                     style={{ background: item.color }}
                                 />
                             </div>
-                            <span className="item-amount">{budget.currency}{item.amount}</span>
+                            <span className="item-amount" title={`${money(item.low)} – ${money(item.high)}`}>{money(item.mean)}</span>
                         </div>
                     ))}
                 </div>
 
+                {showDays && (
+                    <>
+                        <h3 style={{ marginTop: '3rem', marginBottom: '1.5rem' }}>Day by Day</h3>
+                        <div className="breakdown-list">
+                            {forecast.days.map((day) => (
+                                <div key={day.day} className="breakdown-item">
+                                    <div className="item-header">Day {day.day}</div>
+                                    <div className="progress-bar-bg">
+                                        <div className="progress-bar-fill" style={{ width: `${(day.high / total.high) * 100}%`, background: '#c7d2fe' }} />
+                                    </div>
+                                    <span className="item-amount" title={`${money(day.low)} – ${money(day.high)}`}>{money(day.mean)}</span>
+                                </div>
+                            ))}
+                        </div>
+                    </>
+                )}
+
                 <div className="ai-insight glass-panel">
                     <AlertCircle size={20} className="icon-accent" />
-                    <p><strong>AI Insight:</strong> Based on current flight trends to Paris, you might save 15% if you book your activities 2 weeks in advance.</p>
+                    <p>
+                        <strong>Forecast:</strong> expect {money(total.low)} to {money(total.high)} in total (80% range).
+                        {budget && ` There is a ${Math.round(budget.over_probability * 100)}% chance of going over your ${money(budget.amount)} budget.`}
+                    </p>
                 </div>
 
             </motion.div>
@@ -117,6 +171,7 @@ const Budget = () => {
         .icon-box.success { background: #10b981; }
         
         .amount { font-size: 1.5rem; font-weight: 700; color: var(--text-main); }
+        .range { font-size: 0.85rem; }
         
         .breakdown-list { display: flex; flex-direction: column; gap: 1rem; }
         .breakdown-item { display: grid; grid-template-columns: 150px 1fr 80px; align-items: center; gap: 1rem; }
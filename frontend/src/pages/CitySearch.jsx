@@ -6,6 +6,7 @@ const CitySearch = () => {
     const [searchTerm, setSearchTerm] = useState('');
     const [cities, setCities] = useState([]);
     const [isLoading, setIsLoading] = useState(false);
+    const [suggestions, setSuggestions] = useState([]);
 
     useEffect(() => {
         handleSearch('popular destinations');
@@ -33,6 +34,23 @@ const CitySearch = () => {
         }
     };
 
+    // Typeahead is served from the backend's local destination index, never the AI
+    const handleInput = async (e) => {
+        const value = e.target.value;
+        setSearchTerm(value);
+        if (value.trim().length < 2) {
+            setSuggestions([]);
+            return;
+        }
+        try {
+            const res = await fetch(`http://localhost:8001/api/search-cities/autocomplete?q=${encodeURIComponent(value)}`);
+            const data = await res.json();
+            setSuggestions(data.cities || []);
+        } catch {
+            setSuggestions([]);
+        }
+    };
+
     const handleKeyDown = (e) => {
         if (e.key === 'Enter') handleSearch();
     };
@@ -49,9 +67,13 @@ const CitySearch = () => {
                         type="text"
                         placeholder="Search for cities, regions, or vibes..."
                         value={searchTerm}
-                        onChange={(e) => setSearchTerm(e.target.value)}
+                        onChange={handleInput}
                         onKeyDown={handleKeyDown}
+                        list="destination-suggestions"
                     />
+                    <datalist id="destination-suggestions">
+                        {suggestions.map(city => <option key={city.name} value={city.name} />)}
+                    </datalist>
                     <button className="btn btn-primary" onClick={handleSearch} disabled={isLoading}>
                         {isLoading ? <RefreshCw className="spin" size={20} /> : 'Search'}
                     </button>
@@ -6,10 +6,48 @@ import {
     Sparkles, Send, Save, RefreshCw, Wand2
 } from 'lucide-react';
 
+// Reads a server-sent-events plan stream, calling onText with the text so far.
+// Resolves with the "done" event payload ({ plan, fallback }).
+const streamPlan = async (url, body, onText) => {
+    const res = await fetch(url, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(body),
+    });
+    if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let text = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
+        for (const raw of events) {
+            const event = raw.match(/^event: (.*)$/m)?.[1];
+            const data = raw.match(/^data: (.*)$/m)?.[1];
+            if (!event || !data) continue;
+            const payload = JSON.parse(data);
+            if (event === 'chunk') {
+                text += payload.text;
+                onText(text);
+            } else if (event === 'done') {
+                onText(payload.plan);
+                return payload;
+            }
+        }
+    }
+    return { plan: text, fallback: false };
+};
+
 const CreateTrip = () => {
     const navigate = useNavigate();
     const [isLoading, setIsLoading] = useState(false);
     const [generatedPlan, setGeneratedPlan] = useState("");
+    const [planFallback, setPlanFallback] = useState(false);
     const [modificationInstruction, setModificationInstruction] = useState("");
 
     const [formData, setFormData] = useState({
@@ -28,17 +66,18 @@ const CreateTrip = () => {
     const handleGenerate = async (e) => {
         e.preventDefault();
         setIsLoading(true);
+        let scrolled = false;
         try {
-            const res = await fetch('http://localhost:8001/api/create-agentic-plan', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(formData),
+            const result = await streamPlan('http://localhost:8001/api/create-agentic-plan/stream', formData, (text) => {
+                setGeneratedPlan(text);
+                if (!scrolled) {
+                    scrolled = true;
+                    setTimeout(() => {
+                        document.getElementById('itinerary-results')?.scrollIntoView({ behavior: 'smooth' });
+                    }, 100);
+                }
             });
-            const data = await res.json();
-            setGeneratedPlan(data.plan);
-            setTimeout(() => {
-                document.getElementById('itinerary-results')?.scrollIntoView({ behavior: 'smooth' });
-            }, 100);
+            setPlanFallback(Boolean(result.fallback));
         } catch (error) {
             alert("Error generating plan: " + error.message);
         } finally {
@@ -51,6 +90,7 @@ const CreateTrip = () => {
         if (!modificationInstruction) return;
         setIsLoading(true);
         try {
+            // Only the days named in the instruction are regenerated server-side
             const res = await fetch('http://localhost:8001/api/modify-plan', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
@@ -85,11 +125,16 @@ const CreateTrip = () => {
                     endDate: formData.endDate,
                     notes: formData.notes,
                     final_plan: generatedPlan,
-                    destination: formData.city
+                    plan_fallback: planFallback,
+                    destination: formData.city,
+                    budgetType: formData.budgetType,
+                    budgetAmount: formData.budgetAmount
                 }),
             });
             const data = await res.json();
             if (res.ok) {
+                const overlapping = (data.overlaps || []).map((t) => `${t.name} (${t.startDate} - ${t.endDate})`);
+                if (overlapping.length) alert("Heads up: this trip overlaps with " + overlapping.join(', '));
                 alert("Trip saved successfully! Redirecting to your trips...");
                 navigate('/my-trips');
             } else {
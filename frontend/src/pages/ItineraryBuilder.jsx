@@ -13,44 +13,24 @@ const ItineraryBuilder = () => {
         const fetchTrip = async () => {
             try {
                 const token = localStorage.getItem('token');
+                // Only the structured day/activity rows are needed here, not the plan text
                 const res = await axios.get(`http://localhost:5000/api/trips/${tripId}`, {
-                    headers: { Authorization: `Bearer ${token}` }
+                    headers: { Authorization: `Bearer ${token}` },
+                    params: { fields: 'id,days' }
                 });
-                // Initialize mock drag-drop data structure from the text if possible, or just raw blocks
-                // For this demo, we create "Activity Cards" from lines starting with "-"
-                const planText = res.data.plan_details || "";
 
-                // Robust parsing of "Day X"
-                // Split by "Day <number>" (case insensitive, optional colon)
-                const daySplit = planText.split(/(?=Day\s+\d+)/i);
-
-                const parsedDays = daySplit.filter(s => s.trim().length > 0).map((dayContent, index) => {
-                    // Extract title (e.g. "Day 1: Paris")
-                    const lines = dayContent.trim().split('\n');
-                    const title = lines[0].trim();
-
-                    // Extract activities (lines that look like list items or have substantial content)
-                    const activityLines = lines.slice(1).filter(line => {
-                        const l = line.trim();
-                        return l.length > 5 && (l.startsWith('-') || l.startsWith('*') || l.match(/^\d+\./));
-                    });
-
-                    // If no list items found, just take non-empty lines that aren't headers (simplified)
-                    const finalActivities = activityLines.length > 0 ? activityLines : lines.slice(1).filter(l => l.trim().length > 10);
-
-                    return {
-                        id: `day-${index + 1}`,
-                        date: title || `Day ${index + 1}`,
-                        activities: finalActivities.map((line, i) => ({
-                            id: `day-${index}-act-${i}`,
-                            title: line.replace(/^[-*•]\s*/, '').replace(/^\d+\.\s*/, '').trim(),
-                            type: 'general'
-                        }))
-                    };
-                });
-
-                // Fallback if parsing completely fails but text exists
-                if (parsedDays.length === 0 && planText.length > 0) {
+                const parsedDays = res.data.days.map((day, index) => ({
+                    id: `day-${day.day}`,
+                    date: `Day ${day.day}: ${day.title}`,
+                    activities: day.activities.map((activity, i) => ({
+                        id: `day-${index}-act-${i}`,
+                        title: activity.description,
+                        type: activity.slot ? activity.slot.toLowerCase() : 'general'
+                    }))
+                }));
+
+                // Fallback for free-form plans that have no day structure
+                if (parsedDays.length === 0) {
                     parsedDays.push({
                         id: 'day-1',
                         date: 'Itinerary',
@@ -4,28 +4,35 @@ import { motion } from 'framer-motion';
 import axios from 'axios';
 import { Calendar, MapPin, Clock, ArrowLeft, Printer, Share2 } from 'lucide-react';
 
+const DAYS_PER_PAGE = 5;
+
 const ItineraryView = () => {
     const { tripId } = useParams();
     const [trip, setTrip] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [loadingMore, setLoadingMore] = useState(false);
+
+    // Days are fetched in pages from the normalized trip_day rows, by position
+    // rather than day number so gaps in the numbering don't stall paging
+    const fetchTripData = async (params) => {
+        const token = localStorage.getItem('token');
+        const res = await axios.get(`http://localhost:5000/api/trips/${tripId}`, {
+            headers: { Authorization: `Bearer ${token}` },
+            params
+        });
+        return res.data;
+    };
+    const fetchDays = (offset) => fetchTripData({ day_offset: offset, day_limit: DAYS_PER_PAGE });
 
     useEffect(() => {
         const fetchTrip = async () => {
             try {
-                const token = localStorage.getItem('token');
-                const res = await axios.get(`http://localhost:5000/api/trips/${tripId}`, {
-                    headers: { Authorization: `Bearer ${token}` }
-                });
-
-                // Parse the plan text into days
-                // Assuming format "Day 1: ... \n Day 2: ..."
-                const planText = res.data.plan_details || "";
-                const days = planText.split(/Day \d+:/g).filter(Boolean).map((dayContent, index) => ({
-                    day: index + 1,
-                    content: dayContent.trim()
-                }));
-
-                setTrip({ ...res.data, parsedDays: days });
+                const data = await fetchDays(0);
+                // Free-form plans without "Day N:" sections have no day rows; show the text instead
+                const planDetails = data.day_count === 0
+                    ? (await fetchTripData({ fields: 'plan_details' })).plan_details
+                    : null;
+                setTrip({ ...data, parsedDays: data.days, planDetails });
             } catch (err) {
                 console.error(err);
             } finally {
@@ -35,6 +42,33 @@ const ItineraryView = () => {
         if (tripId) fetchTrip();
     }, [tripId]);
 
+    const loadMoreDays = async () => {
+        setLoadingMore(true);
+        try {
+            const data = await fetchDays(trip.parsedDays.length);
+            setTrip({ ...trip, parsedDays: [...trip.parsedDays, ...data.days] });
+        } catch (err) {
+            console.error(err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
+    const shareTrip = async () => {
+        try {
+            const token = localStorage.getItem('token');
+            const res = await axios.post(`http://localhost:5000/api/trips/${tripId}/share`, {}, {
+                headers: { Authorization: `Bearer ${token}` }
+            });
+            const link = `${window.location.origin}${res.data.url}`;
+            await navigator.clipboard?.writeText(link);
+            alert(`Share link copied: ${link}`);
+        } catch (err) {
+            console.error(err);
+            alert('Could not create a share link');
+        }
+    };
+
     if (loading) return <div className="container" style={{ paddingTop: '4rem' }}>Loading itinerary...</div>;
     if (!trip) return <div className="container">Trip not found.</div>;
 
@@ -57,7 +91,7 @@ const ItineraryView = () => {
                 </div>
                 <div className="action-buttons flex-center" style={{ gap: '1rem' }}>
                     <button className="btn btn-secondary" onClick={() => window.print()}><Printer size={18} /> Print</button>
-                    <button className="btn btn-primary"><Share2 size={18} /> Share</button>
+                    <button className="btn btn-primary" onClick={shareTrip}><Share2 size={18} /> Share</button>
                 </div>
             </motion.div>
 
@@ -77,11 +111,25 @@ const ItineraryView = () => {
 
                         <div className="activities-column" style={{ flex: 1, whiteSpace: 'pre-wrap', lineHeight: '1.8' }}>
                             {/* Simple text rendering for now since AI returns unstructured text blobs mostly */}
-                            {day.content}
+                            {day.content.replace(/^Day \d+:\s*/, '')}
                         </div>
                     </motion.div>
                 ))}
+
+                {trip.parsedDays.length === 0 && trip.planDetails && (
+                    <div className="glass-panel" style={{ padding: '1.5rem', whiteSpace: 'pre-wrap', lineHeight: '1.8' }}>
+                        {trip.planDetails}
+                    </div>
+                )}
             </div>
+
+            {trip.parsedDays.length < trip.day_count && (
+                <div className="flex-center">
+                    <button className="btn btn-secondary" onClick={loadMoreDays} disabled={loadingMore}>
+                        {loadingMore ? 'Loading...' : `Show more days (${trip.day_count - trip.parsedDays.length} left)`}
+                    </button>
+                </div>
+            )}
         </div>
     );
 };
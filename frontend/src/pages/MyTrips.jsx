@@ -7,21 +7,28 @@ import axios from 'axios';
 const MyTrips = () => {
     const [trips, setTrips] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [total, setTotal] = useState(0);
+
+    // The list is paginated server-side; X-Next-Cursor points at the next page
+    const fetchTrips = async (cursor = null) => {
+        try {
+            const token = localStorage.getItem('token');
+            const res = await axios.get('http://localhost:5000/api/trips', {
+                headers: { Authorization: `Bearer ${token}` },
+                params: cursor ? { cursor } : {}
+            });
+            setTrips(prev => cursor ? [...prev, ...res.data] : res.data);
+            setNextCursor(res.headers['x-next-cursor'] || null);
+            setTotal(Number(res.headers['x-total-count'] || 0));
+        } catch (err) {
+            console.error("Error fetching trips", err);
+        } finally {
+            setLoading(false);
+        }
+    };
 
     useEffect(() => {
-        const fetchTrips = async () => {
-            try {
-                const token = localStorage.getItem('token');
-                const res = await axios.get('http://localhost:5000/api/trips', {
-                    headers: { Authorization: `Bearer ${token}` }
-                });
-                setTrips(res.data);
-            } catch (err) {
-                console.error("Error fetching trips", err);
-            } finally {
-                setLoading(false);
-            }
-        };
         fetchTrips();
     }, []);
 
@@ -34,7 +41,7 @@ const MyTrips = () => {
             >
                 <div className="flex-between" style={{ marginBottom: '2rem' }}>
                     <h1 style={{ display: 'flex', alignItems: 'center', gap: '0.5rem' }}>
-                        My Adventures <span style={{ fontSize: '0.6em', opacity: 0.5 }}>({trips.length})</span>
+                        My Adventures <span style={{ fontSize: '0.6em', opacity: 0.5 }}>({total})</span>
                     </h1>
                     <Link to="/create-trip" className="btn btn-primary">
                         <Plus size={18} /> New Trip
@@ -115,6 +122,14 @@ const MyTrips = () => {
                         ))}
                     </div>
                 )}
+
+                {nextCursor && (
+                    <div className="flex-center" style={{ marginTop: '2rem' }}>
+                        <button className="btn btn-secondary" onClick={() => fetchTrips(nextCursor)}>
+                            Load more trips
+                        </button>
+                    </div>
+                )}
             </motion.div>
         </div>
     );
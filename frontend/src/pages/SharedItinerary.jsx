@@ -1,18 +1,86 @@
-import React from 'react';
-import { Share2 } from 'lucide-react';
+import React, { useState, useEffect } from 'react';
+import { useParams } from 'react-router-dom';
+import { motion } from 'framer-motion';
+import { Share2, Calendar } from 'lucide-react';
 
 const SharedItinerary = () => {
+    const { shareId } = useParams();
+    const [trip, setTrip] = useState(null);
+    const [loading, setLoading] = useState(true);
+
+    useEffect(() => {
+        // Public link: redirects to an immutable snapshot the browser can cache, no login needed
+        const fetchSnapshot = async () => {
+            try {
+                const res = await fetch(`http://localhost:5000/api/share/${shareId}`);
+                if (res.ok) setTrip(await res.json());
+            } catch (err) {
+                console.error(err);
+            } finally {
+                setLoading(false);
+            }
+        };
+        fetchSnapshot();
+    }, [shareId]);
+
+    if (loading) return <div className="container" style={{ paddingTop: '4rem' }}>Loading itinerary...</div>;
+
+    if (!trip) {
+        return (
+            <div className="container flex-center" style={{ minHeight: '80vh' }}>
+                <div className="glass-panel" style={{ padding: '3rem', textAlign: 'center', maxWidth: '600px' }}>
+                    <div style={{ width: '80px', height: '80px', background: '#e0f2fe', borderRadius: '50%', display: 'flex', alignItems: 'center', justifyContent: 'center', margin: '0 auto 1.5rem', color: '#0ea5e9' }}>
+                        <Share2 size={40} />
+                    </div>
+                    <h1>Shared trip not found</h1>
+                    <p className="text-secondary">
+                        This link may have been removed by the trip owner.
+                    </p>
+                </div>
+            </div>
+        );
+    }
+
     return (
-        <div className="container flex-center" style={{ minHeight: '80vh' }}>
-            <div className="glass-panel" style={{ padding: '3rem', textAlign: 'center', maxWidth: '600px' }}>
-                <div style={{ width: '80px', height: '80px', background: '#e0f2fe', borderRadius: '50%', display: 'flex', alignItems: 'center', justifyContent: 'center', margin: '0 auto 1.5rem', color: '#0ea5e9' }}>
-                    <Share2 size={40} />
+        <div className="container" style={{ paddingBottom: '4rem' }}>
+            <motion.div
+                initial={{ opacity: 0 }}
+                animate={{ opacity: 1 }}
+                className="view-header"
+                style={{ marginBottom: '2rem' }}
+            >
+                <h1>{trip.city} Itinerary</h1>
+                <div style={{ display: 'flex', gap: '1rem', color: 'var(--text-secondary)', marginTop: '0.5rem' }}>
+                    <span className="flex-center" style={{ gap: '0.5rem' }}><Calendar size={16} /> {trip.startDate} - {trip.endDate}</span>
                 </div>
-                <h1>Public Itinerary View</h1>
-                <p className="text-secondary">
-                    This is what your friends will see when you share a trip link.
-                    It will be a read-only version of the Itinerary View.
-                </p>
+                {trip.description && <p className="text-secondary" style={{ marginTop: '1rem' }}>{trip.description}</p>}
+            </motion.div>
+
+            <div className="itinerary-list">
+                {trip.days.map((day, idx) => (
+                    <motion.div
+                        key={day.day}
+                        initial={{ opacity: 0, x: -20 }}
+                        animate={{ opacity: 1, x: 0 }}
+                        transition={{ delay: idx * 0.1 }}
+                        className="day-container glass-panel"
+                        style={{ padding: '1.5rem', marginBottom: '1.5rem', display: 'flex', gap: '2rem' }}
+                    >
+                        <div className="day-sticker" style={{ minWidth: '80px', borderRight: '1px solid var(--border)' }}>
+                            <span style={{ fontSize: '1.5rem', fontWeight: 700, color: 'var(--primary)', display: 'block' }}>Day {day.day}</span>
+                        </div>
+
+                        <div className="activities-column" style={{ flex: 1, whiteSpace: 'pre-wrap', lineHeight: '1.8' }}>
+                            {day.content.replace(/^Day \d+:\s*/, '')}
+                        </div>
+                    </motion.div>
+                ))}
+
+                {trip.days.length === 0 && trip.plan_details && (
+                    <div className="glass-panel" style={{ padding: '1.5rem', whiteSpace: 'pre-wrap', lineHeight: '1.8' }}>
+                        {trip.plan_details}
+                    </div>
+                )}
             </div>
         </div>
     );
@@ -1,27 +1,124 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
+import { useParams, Link } from 'react-router-dom';
 import { motion } from 'framer-motion';
+import { ChevronLeft, ChevronRight, AlertTriangle } from 'lucide-react';
+
+const MONTHS_PER_PAGE = 6;
+
+const toMonth = (date) => `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}`;
+const shiftMonth = (month, count) => {
+    const [year, m] = month.split('-').map(Number);
+    return toMonth(new Date(year, m - 1 + count, 1));
+};
+const monthLabel = (month) => {
+    const [year, m] = month.split('-').map(Number);
+    return new Date(year, m - 1, 1).toLocaleString('default', { month: 'long', year: 'numeric' });
+};
 
 const Timeline = () => {
+    const { tripId } = useParams();
+    const [from, setFrom] = useState(null);
+    const [timeline, setTimeline] = useState(null);
+    const [loading, setLoading] = useState(true);
+
+    const authHeaders = () => ({ Authorization: `Bearer ${localStorage.getItem('token')}` });
+
+    // Start the window at the month of the trip this page was opened from
+    useEffect(() => {
+        const anchor = async () => {
+            let month = toMonth(new Date());
+            try {
+                const res = await fetch(`http://localhost:5000/api/trips/${tripId}?fields=startDate`, { headers: authHeaders() });
+                if (res.ok) month = (await res.json()).startDate.slice(0, 7);
+            } catch (err) {
+                console.error(err);
+            }
+            setFrom(month);
+        };
+        anchor();
+    }, [tripId]);
+
+    // One range query per window; months list trip ids, trips are sent once
+    useEffect(() => {
+        if (!from) return;
+        const fetchTimeline = async () => {
+            setLoading(true);
+            try {
+                const to = shiftMonth(from, MONTHS_PER_PAGE - 1);
+                const res = await fetch(`http://localhost:5000/api/trips/timeline?from=${from}&to=${to}`, { headers: authHeaders() });
+                if (res.ok) setTimeline(await res.json());
+            } catch (err) {
+                console.error(err);
+            } finally {
+                setLoading(false);
+            }
+        };
+        fetchTimeline();
+    }, [from]);
+
+    if (!timeline) return <div className="container" style={{ paddingTop: '4rem' }}>Loading timeline...</div>;
+
+    const trips = Object.fromEntries(timeline.trips.map((t) => [t.id, t]));
+    const conflicting = new Set(timeline.conflicts.flat());
+
     return (
-        <div className="container flex-center" style={{ minHeight: '60vh' }}>
-            <motion.div
-                initial={{ scale: 0.9, opacity: 0 }}
-                animate={{ scale: 1, opacity: 1 }}
-                className="glass-panel"
-                style={{ padding: '3rem', textAlign: 'center', maxWidth: '500px' }}
-            >
-                <img
-                    src="https://cdn-icons-png.flaticon.com/512/3652/3652191.png"
-                    alt="Timeline"
-                    style={{ width: '80px', marginBottom: '1.5rem', opacity: 0.8 }}
-                />
-                <h2>Visual Timeline 🚀</h2>
-                <p className="text-secondary" style={{ margin: '1rem 0' }}>
-                    We are building a stunning Gantt-chart style timeline for your trips.
-                    This advanced feature will be available in the next update!
-                </p>
-                <button className="btn btn-secondary">Notify Me</button>
+        <div className="container" style={{ paddingBottom: '4rem' }}>
+            <motion.div initial={{ opacity: 0, y: 20 }} animate={{ opacity: 1, y: 0 }} className="glass-panel" style={{ padding: '2rem' }}>
+                <div className="flex-between" style={{ marginBottom: '2rem' }}>
+                    <div>
+                        <h1>Trip Timeline</h1>
+                        <p className="text-secondary">{monthLabel(from)} – {monthLabel(shiftMonth(from, MONTHS_PER_PAGE - 1))}</p>
+                    </div>
+                    <div style={{ display: 'flex', gap: '0.5rem' }}>
+                        <button className="btn btn-secondary" disabled={loading} onClick={() => setFrom(shiftMonth(from, -MONTHS_PER_PAGE))}>
+                            <ChevronLeft size={18} />
+                        </button>
+                        <button className="btn btn-secondary" disabled={loading} onClick={() => setFrom(shiftMonth(from, MONTHS_PER_PAGE))}>
+                            <ChevronRight size={18} />
+                        </button>
+                    </div>
+                </div>
+
+                {timeline.conflicts.length > 0 && (
+                    <div className="timeline-warning">
+                        <AlertTriangle size={18} />
+                        <span>{timeline.conflicts.length} pair(s) of trips overlap in this period.</span>
+                    </div>
+                )}
+
+                {timeline.months.map((month) => (
+                    <div key={month.month} className="timeline-month">
+                        <h3>{monthLabel(month.month)}</h3>
+                        {month.trip_ids.length === 0 && <p className="text-secondary">No trips</p>}
+                        <div className="timeline-trips">
+                            {month.trip_ids.map((id) => {
+                                const trip = trips[id];
+                                return (
+                                    <Link
+                                        key={id}
+                                        to={`/trip/${id}`}
+                                        className={`timeline-trip ${String(id) === tripId ? 'current' : ''} ${conflicting.has(id) ? 'conflict' : ''}`}
+                                    >
+                                        <strong>{trip.location || trip.name}</strong>
+                                        <span>{trip.startDate} – {trip.endDate}</span>
+                                    </Link>
+                                );
+                            })}
+                        </div>
+                    </div>
+                ))}
             </motion.div>
+
+            <style>{`
+        .timeline-month { border-left: 3px solid var(--border); padding: 0 0 1.5rem 1.5rem; position: relative; }
+        .timeline-month::before { content: ''; position: absolute; left: -8px; top: 4px; width: 13px; height: 13px; border-radius: 50%; background: var(--primary); }
+        .timeline-month h3 { margin-bottom: 0.75rem; }
+        .timeline-trips { display: flex; flex-wrap: wrap; gap: 0.75rem; }
+        .timeline-trip { display: flex; flex-direction: column; padding: 0.75rem 1rem; border-radius: var(--radius-lg); background: rgba(255,255,255,0.6); border: 1px solid var(--border); color: var(--text-main); text-decoration: none; font-size: 0.9rem; }
+        .timeline-trip.current { border-color: var(--primary); box-shadow: 0 0 0 2px rgba(99, 102, 241, 0.2); }
+        .timeline-trip.conflict { border-left: 4px solid #f59e0b; }
+        .timeline-warning { display: flex; gap: 0.5rem; align-items: center; padding: 0.75rem 1rem; margin-bottom: 1.5rem; border-radius: var(--radius-lg); background: rgba(245, 158, 11, 0.1); color: #b45309; }
+      `}</style>
         </div>
     );
 };